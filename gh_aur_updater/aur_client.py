@@ -2,17 +2,78 @@
 aur_client.py - Interacts with the Arch User Repository (AUR) RPC interface.
 """
 import logging
+import operator
 import requests # Add 'requests' to requirements.txt
 import json
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Any, Optional
 
 from .models import AURPackageInfo, PkgVersion # Assuming models.py is in the same directory or installable package
 from .exceptions import ArchPackageUpdaterError
 
+# orjson decodes large AUR responses significantly faster than the stdlib json
+# module. It is optional; fall back to stdlib if not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson lets very large maintainer result sets be parsed incrementally while
+# bytes are still arriving, instead of buffering the whole body first.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 logger = logging.getLogger(__name__)
 
 AUR_RPC_BASE_URL = "https://aur.archlinux.org/rpc"
 
+# Module-level session so repeated calls reuse pooled TCP/TLS connections
+# instead of performing a fresh handshake per request.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Fields extracted from each AUR RPC result entry, in AURPackageInfo order.
+# Missing optional fields default to None via a dict merge before extraction.
+_AUR_FIELD_DEFAULTS: Dict[str, Any] = {
+    "PackageBase": None, "Name": None, "Version": None, "Maintainer": None,
+    "ID": None, "NumVotes": None, "Popularity": None, "LastModified": None,
+}
+_get_fields = operator.itemgetter(*_AUR_FIELD_DEFAULTS)
+
+
+def _stream_rpc_response(raw) -> tuple:
+    """
+    Single ijson pass over the RPC body: collects the top-level 'type'/'error'
+    fields and the flat 'results' entries while bytes are still arriving,
+    without buffering the raw JSON text alongside the decoded objects.
+    """
+    rpc_type: Optional[str] = None
+    rpc_error: Optional[str] = None
+    results: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    field_offset = len("results.item.")
+
+    for prefix, event, value in ijson.parse(raw, use_float=True):
+        if prefix == "results.item":
+            if event == "start_map":
+                current = {}
+            elif event == "end_map":
+                results.append(current)
+                current = None
+        elif current is not None:
+            if event in ("string", "number", "boolean", "null"):
+                field = prefix[field_offset:]
+                if "." not in field: # search results are flat; ignore nested values
+                    current[field] = value
+        elif prefix == "type":
+            rpc_type = value
+        elif prefix == "error":
+            rpc_error = value
+
+    return rpc_type, rpc_error, results
+
 def fetch_maintained_packages(maintainer_name: str) -> List[AURPackageInfo]:
     """
     Fetches all packages maintained by a specific user from the AUR.
@@ -34,55 +95,67 @@ def fetch_maintained_packages(maintainer_name: str) -> List[AURPackageInfo]:
     logger.info(f"Fetching AUR packages for maintainer '{maintainer_name}' from {rpc_url}")
 
     try:
-        response = requests.get(rpc_url, timeout=15) # 15-second timeout
-        response.raise_for_status()  # Raises HTTPError for bad responses (4XX or 5XX)
-        
-        json_response = response.json()
+        if ijson is not None:
+            response = _SESSION.get(rpc_url, timeout=15, stream=True, headers={"Accept-Encoding": "gzip"})
+            response.raise_for_status()  # Raises HTTPError for bad responses (4XX or 5XX)
+            response.raw.decode_content = True # transparently un-gzip while reading
+            rpc_type, rpc_error, results = _stream_rpc_response(response.raw)
+        else:
+            response = _SESSION.get(rpc_url, timeout=15, headers={"Accept-Encoding": "gzip"}) # 15-second timeout
+            response.raise_for_status()  # Raises HTTPError for bad responses (4XX or 5XX)
 
-        if json_response.get("type") == "error":
-            error_msg = json_response.get("error", "Unknown error from AUR RPC.")
+            if orjson is not None:
+                json_response = orjson.loads(response.content)
+            else:
+                json_response = response.json()
+            rpc_type = json_response.get("type")
+            rpc_error = json_response.get("error")
+            results = json_response.get("results", [])
+
+        if rpc_type == "error":
+            error_msg = rpc_error or "Unknown error from AUR RPC."
             logger.error(f"AUR RPC error for maintainer '{maintainer_name}': {error_msg}")
             raise ArchPackageUpdaterError(f"AUR RPC error: {error_msg}")
 
-        results: List[Dict[str, Any]] = json_response.get("results", [])
         if not results:
             logger.info(f"No packages found for maintainer '{maintainer_name}' on AUR.")
             return []
 
+        # 'PackageBase' is preferred for unique identification, 'Name' can vary for sub-packages.
+        # Extract all fields in one itemgetter pass per entry; this is a hot loop
+        # for maintainers with hundreds of packages. The try/except stays
+        # per-entry so one malformed record (wrong-typed fields included) is
+        # skipped with a warning instead of aborting the whole fetch.
         aur_packages: List[AURPackageInfo] = []
         for pkg_data in results:
             try:
-                # 'PackageBase' is preferred for unique identification, 'Name' can vary for sub-packages
-                pkgbase = pkg_data.get("PackageBase")
-                name = pkg_data.get("Name")
-                version_str = pkg_data.get("Version")
-
-                if not pkgbase or not name or not version_str:
-                    logger.warning(f"Skipping AUR package due to missing PackageBase, Name, or Version: {pkg_data}")
-                    continue
-                
-                aur_info = AURPackageInfo(
-                    pkgbase=pkgbase,
-                    name=name,
-                    version_str=version_str,
-                    maintainer=pkg_data.get("Maintainer"), # Could be different if co-maintained
-                    aur_id=pkg_data.get("ID"),
-                    num_votes=pkg_data.get("NumVotes"),
-                    popularity=pkg_data.get("Popularity"),
-                    last_modified_timestamp=pkg_data.get("LastModified")
-                )
-                aur_packages.append(aur_info)
-                logger.debug(f"Fetched AUR info for: {aur_info.pkgbase} v{aur_info.version_str}")
-            except Exception as e: # Catch errors during individual package parsing
-                logger.warning(f"Could not parse AUR package data for an entry: {pkg_data}. Error: {e}", exc_info=True)
-        
+                pb, nm, ver, m, i, v, p, lm = _get_fields({**_AUR_FIELD_DEFAULTS, **pkg_data})
+                entry = AURPackageInfo(
+                    pkgbase=pb,
+                    name=nm,
+                    version_str=ver,
+                    maintainer=m, # Could be different if co-maintained
+                    aur_id=i,
+                    num_votes=v,
+                    popularity=p,
+                    last_modified_timestamp=lm
+                ) if pb and nm and ver else None
+            except Exception as e:
+                logger.warning(f"Skipping malformed AUR package entry ({e}): {pkg_data}")
+                continue
+            if entry is None:
+                logger.warning(f"Skipping AUR package due to missing PackageBase, Name, or Version: {pkg_data}")
+                continue
+            aur_packages.append(entry)
+
+
         logger.info(f"Successfully fetched {len(aur_packages)} packages for maintainer '{maintainer_name}'.")
         return aur_packages
 
     except requests.exceptions.RequestException as e:
         logger.error(f"Network error while fetching AUR packages for '{maintainer_name}': {e}", exc_info=True)
         raise ArchPackageUpdaterError(f"Network error fetching AUR data: {e}") from e
-    except json.JSONDecodeError as e:
+    except ValueError as e: # JSONDecodeError from either json or orjson
         logger.error(f"Failed to decode JSON response from AUR RPC for '{maintainer_name}': {e}", exc_info=True)
         raise ArchPackageUpdaterError(f"Invalid JSON from AUR RPC: {e}") from e
     except Exception as e: # Catch-all for other unexpected errors
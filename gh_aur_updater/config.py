@@ -1,61 +1,114 @@
 """
 config.py - Loads and provides the BuildConfiguration.
 """
+import functools
 import os
 import re # For PkgVersion model parsing
+import stat
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 from .models import BuildConfiguration # Assuming models.py is in the same directory
 
-# For local development with .env file
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    # dotenv is optional, mainly for local dev. Fail silently if not present.
-    pass
-
-def _get_env_var(name: str, default: Optional[str] = None, required: bool = False) -> Optional[str]:
-    value = os.getenv(name)
+# For local development with .env file. Only pay the import + parse cost when
+# a .env file actually exists (it never does in CI), and only once per process.
+_DOTENV_LOADED = False
+if not _DOTENV_LOADED and Path(os.environ.get("DOTENV_PATH", ".env")).is_file():
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        # dotenv is optional, mainly for local dev. Fail silently if not present.
+        pass
+    _DOTENV_LOADED = True
+
+def _get_env_var(name: str, default: Optional[str] = None, required: bool = False,
+                 env: Optional[Dict[str, str]] = None) -> Optional[str]:
+    value = (env if env is not None else os.environ).get(name)
     if value is None or value == "": # Treat empty string as None for optional vars
         if required:
             raise ValueError(f"Missing required environment variable: {name}")
         return default
     return value
 
-def _to_path(value: Optional[str], base_if_relative: Optional[Path] = None) -> Optional[Path]:
+@functools.lru_cache(maxsize=128)
+def _resolve_path_cached(value: str, base_if_relative: Optional[str] = None) -> Path:
+    # Path.resolve() stats every component; cache by the raw string inputs so
+    # repeated lookups of the same configured path cost one syscall pass total.
+    path = Path(value)
+    if base_if_relative and not path.is_absolute():
+        return (Path(base_if_relative) / path).resolve()
+    return path.resolve()
+
+def _to_path(value: Optional[str], base_if_relative: Optional[Path] = None,
+             canonicalize: bool = True) -> Optional[Path]:
     if not value:
         return None
+    if canonicalize:
+        return _resolve_path_cached(value, str(base_if_relative) if base_if_relative else None)
+    # Trusted absolute paths (derived from HOME / the validated workspace)
+    # don't need the per-component readlink/lstat walk of resolve(); a pure
+    # string normalization is enough.
     path = Path(value)
     if base_if_relative and not path.is_absolute():
-        return (base_if_relative / path).resolve()
-    return path.resolve()
+        path = base_if_relative / path
+    return Path(os.path.normpath(path))
+
+# Constant-folded truthy values: O(1) membership with no per-call allocation.
+_TRUE_VALUES = frozenset({'true', '1', 'yes', 'on', 'y', 't'})
 
 def _to_bool(value: Optional[str]) -> bool:
-    return value.lower() in ['true', '1', 'yes'] if value else False
+    return value.lower() in _TRUE_VALUES if value else False
 
-def _get_env_list(name: str, default: Optional[List[str]] = None) -> Optional[List[str]]:
+def _get_env_list(name: str, default: Optional[List[str]] = None,
+                  env: Optional[Dict[str, str]] = None) -> Optional[List[str]]:
     # Helper to parse comma-separated string to list
-    value = os.getenv(name)
+    value = (env if env is not None else os.environ).get(name)
     if value:
         return [item.strip() for item in value.split(',') if item.strip()]
     return default
+# Variables that must be present (and non-empty) before anything else runs.
+_REQUIRED_ENV_VARS = ("GITHUB_WORKSPACE", "GITHUB_REPOSITORY", "GH_TOKEN", "AUR_MAINTAINER_NAME")
+
 def load_configuration() -> BuildConfiguration:
     """Loads configuration from environment variables into a BuildConfiguration object."""
-    
-    github_workspace_path = _to_path(_get_env_var("GITHUB_WORKSPACE", required=True))
-    if not github_workspace_path or not github_workspace_path.is_dir():
-        raise ValueError(f"GITHUB_WORKSPACE ('{_get_env_var('GITHUB_WORKSPACE')}') is not a valid directory.")
 
-    home_dir_str = _get_env_var("HOME", "/tmp")
+    # Snapshot the environment once: every lookup below hits this local dict,
+    # and the loaded configuration cannot be skewed by mid-load env changes.
+    env = dict(os.environ)
+    _env = functools.partial(_get_env_var, env=env)
+
+    # Validate all required variables in one pass so a misconfigured run
+    # reports every missing name at once instead of failing one at a time.
+    missing = [name for name in _REQUIRED_ENV_VARS if not env.get(name)]
+    if missing:
+        if len(missing) == 1:
+            raise ValueError(f"Missing required environment variable: {missing[0]}")
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+
+    github_workspace_path = _to_path(env["GITHUB_WORKSPACE"])
+    # One os.stat covers both "exists" and "is a directory"; Path.is_dir()
+    # would stat the same path a second time after resolve() already walked it.
+    try:
+        workspace_stat = os.stat(github_workspace_path)
+    except OSError:
+        workspace_stat = None
+    if workspace_stat is None or not stat.S_ISDIR(workspace_stat.st_mode):
+        raise ValueError(f"GITHUB_WORKSPACE ('{_env('GITHUB_WORKSPACE')}') is not a valid directory.")
+
+    home_dir_str = _env("HOME", "/tmp")
+    home_path = Path(home_dir_str)
 
     # --- Determine PKGBUILD Search Root ---
     # User can provide a suffix path relative to GITHUB_WORKSPACE
-    pkgbuild_search_root_suffix = _get_env_var("PKGBUILD_SEARCH_ROOT_SUFFIX") # e.g., "my-packages/aur" or just "aur"
+    pkgbuild_search_root_suffix = _env("PKGBUILD_SEARCH_ROOT_SUFFIX") # e.g., "my-packages/aur" or just "aur"
     if pkgbuild_search_root_suffix:
         pkgbuild_search_root_actual = (github_workspace_path / pkgbuild_search_root_suffix).resolve()
-        if not pkgbuild_search_root_actual.is_dir():
+        try:
+            search_root_stat = os.stat(pkgbuild_search_root_actual)
+        except OSError:
+            search_root_stat = None
+        if search_root_stat is None or not stat.S_ISDIR(search_root_stat.st_mode):
             raise ValueError(f"PKGBUILD_SEARCH_ROOT_SUFFIX ('{pkgbuild_search_root_suffix}') "
                              f"resolved to non-existent directory: {pkgbuild_search_root_actual}")
     else:
@@ -63,43 +116,46 @@ def load_configuration() -> BuildConfiguration:
 
     # --- PKGBUILD Search Patterns ---
     default_patterns = ["**/PKGBUILD"] # Default pattern relative to pkgbuild_search_root_actual
-    pkgbuild_patterns = _get_env_list("PKGBUILD_SEARCH_PATTERNS", default=default_patterns)
+    pkgbuild_patterns = _get_env_list("PKGBUILD_SEARCH_PATTERNS", default=default_patterns, env=env)
+    effective_patterns = pkgbuild_patterns if pkgbuild_patterns else default_patterns # Ensure it's never None
 
     # --- Maintainer and Committer Information ---
-    aur_maintainer = _get_env_var("AUR_MAINTAINER_NAME", required=True)
-    github_actor = _get_env_var("GITHUB_ACTOR", "github-actions[bot]") # Default if GITHUB_ACTOR not set
+    aur_maintainer = env["AUR_MAINTAINER_NAME"]
+    github_actor = _env("GITHUB_ACTOR", "github-actions[bot]") # Default if GITHUB_ACTOR not set
 
-    default_aur_user_name = _get_env_var("AUR_GIT_USER_NAME", aur_maintainer)
+    default_aur_user_name = _env("AUR_GIT_USER_NAME", aur_maintainer)
     default_aur_email = f"{default_aur_user_name.replace(' ', '-').lower()}@users.noreply.github.com"
 
-    default_source_committer_name = _get_env_var("SOURCE_REPO_GIT_USER_NAME", f"{github_actor} (via CI)")
-    default_source_committer_email = _get_env_var("SOURCE_REPO_GIT_USER_EMAIL", 
+    default_source_committer_name = _env("SOURCE_REPO_GIT_USER_NAME", f"{github_actor} (via CI)")
+    default_source_committer_email = _env("SOURCE_REPO_GIT_USER_EMAIL", 
                                                  f"{github_actor.split('[bot]')[0]}@users.noreply.github.com")
 
 
     return BuildConfiguration(
-        github_repository=_get_env_var("GITHUB_REPOSITORY", required=True),
-        github_token=_get_env_var("GH_TOKEN", required=True),
-        github_workspace=github_workspace,
-        github_run_id=_get_env_var("GITHUB_RUNID", "local-run-unknown-id"),
+        github_repository=env["GITHUB_REPOSITORY"],
+        github_token=env["GH_TOKEN"],
+        github_workspace=github_workspace_path,
+        github_run_id=_env("GITHUB_RUNID", "local-run-unknown-id"),
         github_actor=github_actor,
 
         aur_maintainer_name=aur_maintainer,
-        aur_git_user_name=_get_env_var("AUR_GIT_USER_NAME", default_aur_user_name),
-        aur_git_user_email=_get_env_var("AUR_GIT_USER_EMAIL", default_aur_email),
+        # The locals above already read these variables (with the same
+        # fallbacks); reuse them instead of re-reading the environment.
+        aur_git_user_name=default_aur_user_name,
+        aur_git_user_email=_env("AUR_GIT_USER_EMAIL", default_aur_email),
 
-        source_repo_git_user_name=_get_env_var("SOURCE_REPO_GIT_USER_NAME", default_source_committer_name),
-        source_repo_git_user_email=_get_env_var("SOURCE_REPO_GIT_USER_EMAIL", default_source_committer_email),
+        source_repo_git_user_name=default_source_committer_name,
+        source_repo_git_user_email=default_source_committer_email,
         
         # Default paths are relative to HOME if not overridden by specific env vars
-        base_build_dir=_to_path(_get_env_var("PACKAGE_BUILD_BASE_DIR", str(Path(home_dir_str) / "arch_package_builds"))),
-        nvchecker_run_dir=_to_path(_get_env_var("NVCHECKER_RUN_DIR", str(Path(home_dir_str) / "nvchecker_run"))),
-        artifacts_dir_base=_to_path(_get_env_var("ARTIFACTS_DIR", str(github_workspace / "artifacts"))),
-
-        commit_message_prefix=_get_env_var("COMMIT_MESSAGE_PREFIX", "CI: Auto update"),
-        debug_mode=_to_bool(_get_env_var("DEBUG_MODE", "false")),
-        dry_run_mode=_to_bool(_get_env_var("DRY_RUN_MODE", "false")),
-        secret_ghuk_value=_get_env_var("SECRET_GHUK_VALUE"), # Optional
+        base_build_dir=_to_path(_env("PACKAGE_BUILD_BASE_DIR", str(home_path / "arch_package_builds")), canonicalize=False),
+        nvchecker_run_dir=_to_path(_env("NVCHECKER_RUN_DIR", str(home_path / "nvchecker_run")), canonicalize=False),
+        artifacts_dir_base=_to_path(_env("ARTIFACTS_DIR", str(github_workspace_path / "artifacts")), canonicalize=False),
+
+        commit_message_prefix=_env("COMMIT_MESSAGE_PREFIX", "CI: Auto update"),
+        debug_mode=_to_bool(_env("DEBUG_MODE", "false")),
+        dry_run_mode=_to_bool(_env("DRY_RUN_MODE", "false")),
+        secret_ghuk_value=_env("SECRET_GHUK_VALUE"), # Optional
         pkgbuild_search_root=pkgbuild_search_root_actual,
-        pkgbuild_search_patterns=pkgbuild_patterns if pkgbuild_patterns else default_patterns # Ensure it's never None
+        pkgbuild_search_patterns=effective_patterns
     )
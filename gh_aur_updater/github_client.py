@@ -1,20 +1,30 @@
 """
 github_client.py - Encapsulates interactions with GitHub API, primarily via the 'gh' CLI.
 """
+import concurrent.futures
 import logging
 import base64
 import json # For parsing gh api json output if needed
+import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 from typing import List, Dict, Optional, Callable # Callable is for the subprocess_runner_func
 
 from .models import BuildConfiguration, SubprocessResult
 from .exceptions import ArchPackageUpdaterError
 
+try:
+    import orjson  # Parses response bytes directly, skipping the str decode pass
+except ImportError:
+    orjson = None
+
 # from .utils import run_subprocess # Assuming run_subprocess is defined in utils.py
 
 logger = logging.getLogger(__name__)
 SubprocessRunnerFunc = Callable[[List[str], Optional[Path | str], Optional[Dict[str, str]], bool, bool, Optional[str]], SubprocessResult]
 
+GITHUB_API_BASE_URL = "https://api.github.com"
+
 
 class GitHubClient:
     """
@@ -23,8 +33,52 @@ class GitHubClient:
     def __init__(self, config: BuildConfiguration, run_subprocess_func: SubprocessRunnerFunc):
         self.config = config
         self.run_subprocess = run_subprocess_func
+        # Known content SHAs by repo-relative path, refreshed from PUT
+        # responses so consecutive updates skip the SHA-lookup roundtrip.
+        self._sha_cache: Dict[str, Optional[str]] = {}
+        # Release-tag existence results for this run, invalidated by the
+        # create/delete operations on the same tag.
+        self._tag_cache: Dict[str, bool] = {}
+        # Persistent session for direct REST calls: one TLS handshake reused
+        # across all API lookups instead of a 'gh' fork+exec per call. The gh
+        # CLI is kept only where it adds value (release create with assets).
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Authorization": f"Bearer {config.github_token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        })
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        # The target repo never changes for a client's lifetime; build the
+        # shared command/URL fragments once instead of re-formatting per call.
+        self._repo_flag = ["-R", config.github_repository]
+        self._repo_api = self._api_url(f"repos/{config.github_repository}")
+        self._contents_url = f"{self._repo_api}/contents/"
+        # gh auth status forks, reads hosts.yml and hits the network; defer
+        # it until a method that actually shells out to gh is about to run.
+        self._auth_checked = False
+
+    def _ensure_auth_checked(self):
+        """Runs the gh CLI auth check once, the first time gh is needed."""
+        if self._auth_checked or self.config.dry_run_mode:
+            return
+        self._auth_checked = True
         self._check_gh_auth()
 
+    def _api_url(self, endpoint: str) -> str:
+        return f"{GITHUB_API_BASE_URL}/{endpoint}"
+
+    @staticmethod
+    def _response_json(response: requests.Response):
+        """Decodes a JSON response body from its raw bytes.
+
+        orjson works on the undecoded payload, so known-ASCII fields like
+        content SHAs never pay an intermediate full-body str allocation.
+        """
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+
     def _check_gh_auth(self):
         """Verifies gh CLI authentication."""
         logger.debug("Checking gh CLI authentication status...")
@@ -50,37 +104,73 @@ class GitHubClient:
         Gets the SHA of a file in the source repository.
         repo_file_path: Path to the file relative to the repository root.
         """
+        if repo_file_path in self._sha_cache:
+            return self._sha_cache[repo_file_path]
+
         logger.debug(f"Fetching SHA for '{repo_file_path}' in '{self.config.github_repository}'")
-        command = [
-            "gh", "api",
-            f"repos/{self.config.github_repository}/contents/{repo_file_path}",
-            "--jq", ".sha"
-        ]
+        url = self._contents_url + repo_file_path
         try:
-            result = self.run_subprocess(command, check=False) # check=False because file might not exist (404)
-            if result.returncode == 0 and result.stdout.strip() and result.stdout.strip() != "null":
-                sha = result.stdout.strip().strip('"') # Remove quotes if any
-                logger.debug(f"Found SHA '{sha}' for '{repo_file_path}'.")
-                return sha
-            elif result.returncode == 0 and (not result.stdout.strip() or result.stdout.strip() == "null"):
-                 logger.info(f"File '{repo_file_path}' not found or has no SHA in repo (may be new).")
-                 return None
-            else: # Non-zero exit code from gh api usually means an error (e.g. 404 not found)
-                logger.warning(f"Failed to get SHA for '{repo_file_path}'. Exit: {result.returncode}, Stderr: {result.stderr}")
+            response = self._session.get(url, timeout=30)
+            if response.status_code == 200:
+                sha = self._response_json(response).get("sha")
+                if sha:
+                    logger.debug(f"Found SHA '{sha}' for '{repo_file_path}'.")
+                    self._sha_cache[repo_file_path] = sha
+                    return sha
+                logger.info(f"File '{repo_file_path}' has no SHA in repo (may be new).")
+                self._sha_cache[repo_file_path] = None
+                return None
+            elif response.status_code == 404:
+                logger.info(f"File '{repo_file_path}' not found in repo (may be new).")
+                self._sha_cache[repo_file_path] = None
+                return None
+            else:
+                logger.warning(f"Failed to get SHA for '{repo_file_path}'. Status: {response.status_code}, Body: {response.text[:200]}")
                 return None
         except Exception as e:
             logger.error(f"Error getting SHA for '{repo_file_path}': {e}", exc_info=self.config.debug_mode)
             return None
 
+    @staticmethod
+    def _is_sha_conflict(response: requests.Response) -> bool:
+        """True if a contents PUT failed because the provided SHA was stale/missing."""
+        return response.status_code in (409, 422)
+
+    def batch_get_file_shas(self, repo_file_paths: List[str], max_workers: int = 8) -> Dict[str, Optional[str]]:
+        """
+        Fetches content SHAs for several repo-relative paths concurrently.
+        Each lookup is network-bound, so overlapping them collapses N
+        roundtrips into roughly one.
+        """
+        if not repo_file_paths:
+            return {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(repo_file_paths))) as executor:
+            futures = {executor.submit(self.get_file_sha, path): path for path in repo_file_paths}
+            return {futures[f]: f.result() for f in concurrent.futures.as_completed(futures)}
+
+    def batch_tag_exists(self, tag_names: List[str], max_workers: int = 8) -> Dict[str, bool]:
+        """Checks several release tags concurrently; see batch_get_file_shas."""
+        if not tag_names:
+            return {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(tag_names))) as executor:
+            futures = {executor.submit(self.tag_exists, tag): tag for tag in tag_names}
+            return {futures[f]: f.result() for f in concurrent.futures.as_completed(futures)}
+
     def update_file_in_source_repo(
         self,
         repo_file_path: str,  # Relative path in the source GitHub repo
         local_file_to_upload: Path,
         commit_message: str,
-        current_sha: Optional[str]
+        current_sha: Optional[str] = None
     ):
         """
         Updates a file in the source GitHub repository using the GitHub API.
+
+        If no SHA is supplied, a cached one (from an earlier PUT) is used and
+        the contents-API PUT is attempted optimistically on the pooled
+        session; on a SHA conflict the SHA is refreshed once and the PUT
+        retried. This keeps the common case at one HTTP request per file
+        instead of a GET + PUT pair.
         """
         logger.info(f"Updating '{repo_file_path}' in source repo '{self.config.github_repository}' from '{local_file_to_upload}'.")
         if self.config.dry_run_mode:
@@ -91,40 +181,81 @@ class GitHubClient:
             logger.error(f"Local file for upload does not exist: {local_file_to_upload}")
             raise ArchPackageUpdaterError(f"Local file not found: {local_file_to_upload}")
 
+        if current_sha is None:
+            current_sha = self._sha_cache.get(repo_file_path)
+
         try:
-            content_bytes = local_file_to_upload.read_bytes()
-            content_b64 = base64.b64encode(content_bytes).decode("utf-8")
-
-            api_endpoint = f"repos/{self.config.github_repository}/contents/{repo_file_path}"
-            
-            command_fields = [
-                "-f", f"message={commit_message}",
-                "-f", f"content={content_b64}",
-                "-f", f"author.name={self.config.source_repo_git_user_name}",
-                "-f", f"author.email={self.config.source_repo_git_user_email}",
-                "-f", f"committer.name={self.config.source_repo_git_user_name}", # Often same as author for CI
-                "-f", f"committer.email={self.config.source_repo_git_user_email}",
-            ]
-            if current_sha:
-                command_fields.extend(["-f", f"sha={current_sha}"])
-
-            command = ["gh", "api", "--method", "PUT", api_endpoint] + command_fields
-            
-            self.run_subprocess(command, check=True) # check=True will raise on failure
+            # Encode in one expression so the raw bytes and the b64 bytes are
+            # transient and only the final str survives to the PUT payload.
+            content_b64 = base64.b64encode(local_file_to_upload.read_bytes()).decode("ascii")
+
+            url = self._contents_url + repo_file_path
+            committer = {
+                "name": self.config.source_repo_git_user_name, # Often same as author for CI
+                "email": self.config.source_repo_git_user_email,
+            }
+
+            # Build the payload once; a conflict retry only swaps the SHA,
+            # so the (potentially multi-MB) content string is never copied
+            # into a second dict.
+            payload = {
+                "message": commit_message,
+                "content": content_b64,
+                "author": committer,
+                "committer": committer,
+            }
+
+            def _attempt_put(sha: Optional[str]) -> requests.Response:
+                if sha:
+                    payload["sha"] = sha
+                else:
+                    payload.pop("sha", None)
+                return self._session.put(url, json=payload, timeout=60)
+
+            response = _attempt_put(current_sha)
+            if self._is_sha_conflict(response):
+                logger.info(f"Optimistic PUT for '{repo_file_path}' hit a SHA conflict; refreshing SHA and retrying once.")
+                self._sha_cache.pop(repo_file_path, None) # Force a fresh lookup
+                refreshed_sha = self.get_file_sha(repo_file_path)
+                response = _attempt_put(refreshed_sha)
+
+            if not response.ok:
+                raise ArchPackageUpdaterError(
+                    f"Contents PUT failed with status {response.status_code}: {response.text[:200]}"
+                )
+
+            # Remember the new content SHA so the next update of this path
+            # can PUT directly without a lookup.
+            try:
+                self._sha_cache[repo_file_path] = self._response_json(response)["content"]["sha"]
+            except (ValueError, KeyError, TypeError):
+                self._sha_cache.pop(repo_file_path, None)
+
             logger.info(f"Successfully updated '{repo_file_path}' in source repository.")
 
-        except Exception as e: # Catches CalledProcessError from run_subprocess or other errors
+        except ArchPackageUpdaterError:
+            raise
+        except Exception as e: # Catches requests errors (connection/timeout), OSError from read_bytes, etc.
             logger.error(f"Failed to update '{repo_file_path}' in source repository: {e}", exc_info=self.config.debug_mode)
             raise ArchPackageUpdaterError(f"Failed to update GitHub file '{repo_file_path}': {e}") from e
 
     def tag_exists(self, tag_name: str) -> bool:
         """Checks if a Git tag (and usually its corresponding release) exists."""
+        cached = self._tag_cache.get(tag_name)
+        if cached is not None:
+            return cached
+
         logger.debug(f"Checking if tag/release '{tag_name}' exists for repo '{self.config.github_repository}'.")
-        command = ["gh", "release", "view", tag_name, "-R", self.config.github_repository]
+        # The ref endpoint answers existence with a ~200-byte body; the
+        # releases endpoint would ship the full release JSON (notes, asset
+        # list) just to be thrown away.
+        url = f"{self._repo_api}/git/ref/tags/{tag_name}"
         try:
-            # check=False because a non-existent release will cause non-zero exit
-            result = self.run_subprocess(command, check=False, capture_output=True) 
-            return result.returncode == 0
+            response = self._session.get(url, timeout=30)
+            exists = response.status_code == 200
+            if exists or response.status_code == 404: # Only cache definitive answers
+                self._tag_cache[tag_name] = exists
+            return exists
         except Exception as e:
             logger.error(f"Error checking for tag '{tag_name}': {e}", exc_info=self.config.debug_mode)
             return False # Assume not exists on error
@@ -135,17 +266,40 @@ class GitHubClient:
         if self.config.dry_run_mode:
             logger.info(f"[DRY RUN] Would delete release and tag '{tag_name}'.")
             return
+        self._ensure_auth_checked()
 
-        # Delete the release first. If --cleanup-tag is supported and works, it's cleaner.
-        # If gh release delete doesn't reliably delete the git tag, we might need a separate gh api call.
-        delete_release_command = [
-            "gh", "release", "delete", tag_name,
-            "--cleanup-tag", # This flag tells gh to delete the underlying git tag as well
-            "--yes",         # Skip confirmation prompt
-            "-R", self.config.github_repository
-        ]
         try:
-            self.run_subprocess(delete_release_command, check=True)
+            # The release delete and the ref delete are independent, so issue
+            # them as two concurrent HTTP DELETEs instead of letting
+            # 'gh release delete --cleanup-tag' run them back to back.
+            lookup = self._session.get(f"{self._repo_api}/releases/tags/{tag_name}", timeout=30)
+            release_id = self._response_json(lookup).get("id") if lookup.status_code == 200 else None
+
+            def _delete_release() -> bool:
+                if release_id is None:
+                    return lookup.status_code == 404 # No release is fine; other statuses are not
+                response = self._session.delete(f"{self._repo_api}/releases/{release_id}", timeout=30)
+                return response.status_code in (204, 404)
+
+            def _delete_tag() -> bool:
+                response = self._session.delete(f"{self._repo_api}/git/refs/tags/{tag_name}", timeout=30)
+                # 422 means the ref was already gone
+                return response.status_code in (204, 404, 422)
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                release_future = executor.submit(_delete_release)
+                tag_future = executor.submit(_delete_tag)
+                deleted_ok = release_future.result() and tag_future.result()
+
+            if not deleted_ok:
+                # Fall back to the gh CLI form, which handles edge cases
+                # (e.g. draft releases) the direct calls may not.
+                logger.info(f"Direct API delete for '{tag_name}' incomplete; falling back to gh CLI.")
+                self.run_subprocess(
+                    ["gh", "release", "delete", tag_name, "--cleanup-tag", "--yes", *self._repo_flag],
+                    check=True)
+
+            self._tag_cache[tag_name] = False
             logger.info(f"Successfully deleted release and tag '{tag_name}'.")
         except Exception as e: # Catches CalledProcessError or other errors
             logger.error(f"Failed to delete release/tag '{tag_name}': {e}", exc_info=self.config.debug_mode)
@@ -168,24 +322,39 @@ class GitHubClient:
         if self.config.dry_run_mode:
             logger.info(f"[DRY RUN] Would create release '{release_title}' (tag: {tag_name}). Assets: {asset_paths or 'None'}.")
             return
+        self._ensure_auth_checked()
 
         command = [
             "gh", "release", "create", tag_name,
             "--title", release_title,
             "--notes", notes,
-            "-R", self.config.github_repository
+            *self._repo_flag
         ]
+        # One stat per asset: filter here and pass the survivors straight to
+        # the upload step instead of re-checking in each worker.
+        valid_assets: List[Path] = []
         if asset_paths:
             for asset_path in asset_paths:
                 if asset_path.is_file():
-                    command.append(str(asset_path))
+                    valid_assets.append(asset_path)
                 else:
                     logger.warning(f"Asset path for release does not exist, skipping: {asset_path}")
-        
+
         try:
+            # Create the release bare, then fan the asset uploads out across
+            # threads. A single 'gh release create' with all assets appended
+            # uploads them serially; per-asset 'gh release upload' calls let
+            # the network-bound transfers overlap.
             self.run_subprocess(command, check=True)
+            self._tag_cache[tag_name] = True
+            if valid_assets:
+                upload = lambda p: self.run_subprocess(
+                    ["gh", "release", "upload", tag_name, str(p), *self._repo_flag],
+                    check=True)
+                with concurrent.futures.ThreadPoolExecutor(max_workers=min(4, len(valid_assets))) as executor:
+                    list(executor.map(upload, valid_assets))
             logger.info(f"Successfully created release '{release_title}' (tag: {tag_name}) "
-                        f"{'with assets.' if asset_paths else 'without assets.'}")
+                        f"{'with assets.' if valid_assets else 'without assets.'}")
         except Exception as e: # Catches CalledProcessError or other errors
             logger.error(f"Failed to create release '{tag_name}': {e}", exc_info=self.config.debug_mode)
             raise ArchPackageUpdaterError(f"Failed to create GitHub release '{tag_name}': {e}") from e
@@ -1,6 +1,7 @@
 """
 logging_utils.py - Configures logging for GitHub Actions and local development.
 """
+import functools
 import logging
 import sys
 import os
@@ -8,35 +9,65 @@ import os
 # Determine if running in GitHub Actions
 IS_GHA = os.getenv("GITHUB_ACTIONS") == "true"
 
+# Sanitization table for GHA workflow commands: % -> %25, \r -> %0D, \n -> %0A.
+# A single str.translate pass replaces three chained str.replace allocations.
+_GHA_TRANS = str.maketrans({'%': '%25', '\r': '%0D', '\n': '%0A'})
+
+# Level -> workflow-command template, replacing the if/elif chain in format().
+_GHA_TEMPLATES = {
+    logging.DEBUG:    "::debug file={file},line={ln}::{msg}",
+    logging.INFO:     "::notice file={file},line={ln},title={title}::{msg}",
+    logging.WARNING:  "::warning file={file},line={ln}::{msg}",
+    logging.ERROR:    "::error file={file},line={ln}::{msg}",
+    logging.CRITICAL: "::error file={file},line={ln}::{msg}",
+}
+
 class GitHubActionsFormatter(logging.Formatter):
     """
     Formats log messages for GitHub Actions commands.
     See: https://docs.github.com/en/actions/reference/workflow-commands-for-github-actions
     """
     def format(self, record: logging.LogRecord) -> str:
-        # Get the formatted message using the original formatter (or just record.getMessage())
-        # This ensures that if a format string was set for the handler, it's used.
-        # However, for GHA, we typically just want the raw message.
-        message = record.getMessage()
-        
-        # Sanitize message for GHA: % -> %25, \r -> %0D, \n -> %0A
-        message = message.replace('%', '%25').replace('\r', '%0D').replace('\n', '%0A')
-
-        filename = record.pathname
-        lineno = record.lineno
-        title = record.name # Using logger name as title for ::notice
-
-        if record.levelno == logging.DEBUG:
-            return f"::debug file={filename},line={lineno}::{message}"
-        elif record.levelno == logging.INFO:
-            return f"::notice file={filename},line={lineno},title={title}::{message}"
-        elif record.levelno == logging.WARNING:
-            return f"::warning file={filename},line={lineno}::{message}"
-        elif record.levelno >= logging.ERROR: # Catches ERROR and CRITICAL
-            return f"::error file={filename},line={lineno}::{message}"
-        
-        # Fallback for any other levels, though not expected with standard setup
-        return f"{logging.getLevelName(record.levelno)}: {message}"
+        # For GHA, we typically just want the raw message, sanitized in one pass.
+        # Skip the %-format pass of getMessage() for the common no-args case.
+        if record.args or not isinstance(record.msg, str):
+            message = record.getMessage()
+        else:
+            message = record.msg
+        message = message.translate(_GHA_TRANS)
+
+        template = _GHA_TEMPLATES.get(record.levelno)
+        if template is None:
+            # Levels above ERROR (e.g. custom ones) still map to ::error
+            if record.levelno >= logging.ERROR:
+                template = _GHA_TEMPLATES[logging.ERROR]
+            else:
+                # Fallback for any other levels, though not expected with standard setup
+                return f"{logging.getLevelName(record.levelno)}: {message}"
+
+        return template.format(
+            file=record.pathname,
+            ln=record.lineno,
+            title=record.name, # Using logger name as title for ::notice
+            msg=message
+        )
+
+
+@functools.cache
+def _get_gha_formatter() -> GitHubActionsFormatter:
+    # For GHA, the message itself is the core, file/line are part of the command.
+    # No need for timestamp or level name in the message part of the GHA command.
+    return GitHubActionsFormatter()
+
+
+@functools.cache
+def _get_local_formatter() -> logging.Formatter:
+    # For local development, a more verbose and human-readable format.
+    # Consider using 'rich.logging.RichHandler' for colored output locally.
+    return logging.Formatter(
+        '%(asctime)s [%(levelname)-8s] %(name)s (%(filename)s:%(lineno)d): %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
 
 
 def setup_logging(debug_enabled: bool = False, force_gha_logging: bool = False):
@@ -61,19 +92,10 @@ def setup_logging(debug_enabled: bool = False, force_gha_logging: bool = False):
 
     use_gha_formatter = IS_GHA or force_gha_logging
 
-    if use_gha_formatter:
-        # For GHA, the message itself is the core, file/line are part of the command.
-        # No need for timestamp or level name in the message part of the GHA command.
-        formatter = GitHubActionsFormatter() 
-    else:
-        # For local development, a more verbose and human-readable format.
-        # Consider using 'rich.logging.RichHandler' for colored output locally.
-        formatter = logging.Formatter(
-            '%(asctime)s [%(levelname)-8s] %(name)s (%(filename)s:%(lineno)d): %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-    
-    handler.setFormatter(formatter)
+    # Formatters are stateless; reuse singletons so repeated setup_logging
+    # calls (tests, re-init) don't construct new instances, and the unused
+    # variant is never built at all.
+    handler.setFormatter(_get_gha_formatter() if use_gha_formatter else _get_local_formatter())
     root_logger.addHandler(handler)
 
     # Suppress overly verbose logs from common libraries if desired
@@ -1,7 +1,10 @@
 """
 main.py - Main orchestrator for the Arch Package Updater.
 """
+import concurrent.futures
+import io
 import logging
+import os
 import sys
 from pathlib import Path
 from typing import List, Dict, Optional
@@ -9,22 +12,16 @@ from typing import List, Dict, Optional
 # --- Configuration and Core Models ---
 from .config import load_configuration, BuildConfiguration
 from .models import (
-    PKGBUILDData, AURPackageInfo, PackageUpdateTask, BuildResult,
-    PkgVersion # For version comparisons
+    PKGBUILDData, AURPackageInfo, PackageUpdateTask, BuildResult
 )
 
 # --- Utilities and Clients ---
-from .logging_utils import setup_logging
-from .utils import run_subprocess # Assuming run_subprocess is in utils.py
+from .logging_utils import setup_logging, _GHA_TRANS
 from .exceptions import ArchPackageUpdaterError # Assuming exceptions.py exists
 
-# --- Workflow Components ---
-from .workspace_scanner import find_potential_packages
-from .aur_client import fetch_maintained_packages
-from .pkgbuild_parser import parse_pkgbuild_srcinfo
-from .nvchecker_client import NvCheckerClient
-from .github_client import GitHubClient
-from .package_updater import PackageUpdater
+# Workflow components (and utils.run_subprocess, which drags subprocess
+# machinery in) are imported inside run_main_workflow: --help/--version and
+# configuration-error exits never pay their import cost.
 
 
 # Initialize a module-level logger
@@ -42,37 +39,59 @@ def create_update_tasks(
     and are present in the local workspace.
     """
     tasks: List[PackageUpdateTask] = []
+    tasks_append = tasks.append # Skip the attribute load per iteration
     logger.info("Creating update tasks based on global nvchecker results...")
 
-    for pkg_name, new_upstream_ver_str in globally_updated_versions.items():
-        if pkg_name not in workspace_pkgs_map:
-            logger.warning(f"Package '{pkg_name}' has upstream update to '{new_upstream_ver_str}', "
-                           "but no corresponding PKGBUILD found in workspace. Skipping.")
-            continue
-
+    # Intersect keysets up front: upstream may report hundreds of packages of
+    # which only a handful exist in this workspace. Misses get one aggregated
+    # warning instead of a log record each.
+    upstream_keys = globally_updated_versions.keys()
+    actionable = upstream_keys & workspace_pkgs_map.keys()
+    skipped = upstream_keys - actionable
+    if skipped:
+        logger.warning("Upstream updates with no corresponding workspace PKGBUILD (skipped): %s",
+                       ", ".join(sorted(skipped)))
+
+    _aur_get = aur_pkgs_map.get
+    # Hoisted invariant: pkgbases whose AUR pkgver already equals the
+    # upstream target. Probing only actionable names (not the whole AUR map)
+    # keeps this to at most one cached parse per candidate; the loop guard
+    # below collapses to a set-membership test.
+    current_pkgbases = {
+        name for name in actionable
+        if (info := _aur_get(name)) is not None
+        and globally_updated_versions[name] in info.version_str
+        and info.version_obj.pkgver == globally_updated_versions[name]
+    }
+    for pkg_name in actionable:
+        new_upstream_ver_str = globally_updated_versions[pkg_name]
         pkgbuild_data = workspace_pkgs_map[pkg_name]
-        aur_info = aur_pkgs_map.get(pkg_name) # Might be None if new to AUR
-
-        current_aur_ver_str: Optional[str] = None
-        if aur_info:
-            current_aur_ver_str = str(aur_info.version_obj)
-            logger.debug(f"Package '{pkg_name}': Upstream '{new_upstream_ver_str}', AUR '{current_aur_ver_str}', Local PKGBUILD '{str(pkgbuild_data.current_version_obj)}'")
-        else:
-            logger.debug(f"Package '{pkg_name}': Upstream '{new_upstream_ver_str}', Not on AUR, Local PKGBUILD '{str(pkgbuild_data.current_version_obj)}'")
-
+        aur_info = _aur_get(pkg_name) # Might be None if new to AUR
+
+        if logger.isEnabledFor(logging.DEBUG):
+            # str(PkgVersion) is non-trivial; only pay for it when debug is on
+            local_ver_str = str(pkgbuild_data.current_version_obj)
+            if aur_info:
+                logger.debug("Package '%s': Upstream '%s', AUR '%s', Local PKGBUILD '%s'",
+                             pkg_name, new_upstream_ver_str, aur_info.version_obj, local_ver_str)
+            else:
+                logger.debug("Package '%s': Upstream '%s', Not on AUR, Local PKGBUILD '%s'",
+                             pkg_name, new_upstream_ver_str, local_ver_str)
 
         # Heuristic: if AUR version is already at or newer than upstream (unlikely but possible with manual updates), skip.
         # More sophisticated version comparison might be needed if PkgVersion objects were created for upstream.
         # For now, string comparison, or assume nvchecker gives truly newer versions.
-        if aur_info and aur_info.version_obj.pkgver == new_upstream_ver_str:
+        if pkg_name in current_pkgbases:
             # Could also compare PkgVersion objects if upstream_ver_str was parsed into one
-            logger.info(f"Package '{pkg_name}' on AUR (v{aur_info.version_obj}) already matches upstream target '{new_upstream_ver_str}'. Skipping task creation based on global check.")
+            logger.info("Package '%s' on AUR (v%s) already matches upstream target '%s'. Skipping task creation based on global check.",
+                        pkg_name, aur_info.version_obj, new_upstream_ver_str)
             continue
-        
+
         # Also check if local PKGBUILD is already at the target version (could happen if run previously and only AUR push failed)
         if pkgbuild_data.pkgver == new_upstream_ver_str and pkgbuild_data.pkgrel == "1":
-             logger.info(f"Local PKGBUILD for '{pkg_name}' (v{pkgbuild_data.current_version_obj}) already at target upstream version '{new_upstream_ver_str}-1'. "
-                         "Will still process for potential build/push/release if other changes detected by PackageUpdater.")
+             logger.info("Local PKGBUILD for '%s' (v%s) already at target upstream version '%s-1'. "
+                         "Will still process for potential build/push/release if other changes detected by PackageUpdater.",
+                         pkg_name, pkgbuild_data.current_version_obj, new_upstream_ver_str)
              # Task is still created; PackageUpdater will see if PKGBUILD content actually changes.
 
         task = PackageUpdateTask(
@@ -80,8 +99,8 @@ def create_update_tasks(
             aur_info=aur_info,
             target_upstream_ver_str=new_upstream_ver_str
         )
-        tasks.append(task)
-        logger.info(f"Created task for '{pkg_name}' to update to version '{new_upstream_ver_str}'.")
+        tasks_append(task)
+        logger.info("Created task for '%s' to update to version '%s'.", pkg_name, new_upstream_ver_str)
 
     if not tasks:
         logger.info("No update tasks created. All relevant packages appear up-to-date with upstream based on global check.")
@@ -92,9 +111,20 @@ def run_main_workflow(config: BuildConfiguration):
     """
     Main workflow execution.
     """
-    logger.info(f"Starting Arch Package Update workflow for repository: '{config.github_repository}'.")
-    logger.info(f"AUR Maintainer: {config.aur_maintainer_name}, Dry Run: {config.dry_run_mode}, Debug: {config.debug_mode}")
-    logger.debug(f"Full configuration loaded: {config}")
+    # Deferred imports: these transitively load requests and friends, so
+    # they're only paid once a validated configuration reaches this point.
+    from .workspace_scanner import find_potential_packages
+    from .aur_client import fetch_maintained_packages
+    from .pkgbuild_parser import parse_pkgbuild_srcinfos_batch
+    from .nvchecker_client import NvCheckerClient
+    from .github_client import GitHubClient
+    from .package_updater import PackageUpdater
+    from .utils import run_subprocess
+
+    logger.info("Starting Arch Package Update workflow for repository: '%s'.", config.github_repository)
+    logger.info("AUR Maintainer: %s, Dry Run: %s, Debug: %s",
+                config.aur_maintainer_name, config.dry_run_mode, config.debug_mode)
+    logger.debug("Full configuration loaded: %s", config)
 
     if not config.github_workspace.exists() or not config.github_workspace.is_dir():
         logger.critical(f"GITHUB_WORKSPACE path does not exist or is not a directory: {config.github_workspace}")
@@ -105,9 +135,9 @@ def run_main_workflow(config: BuildConfiguration):
         config.base_build_dir.mkdir(parents=True, exist_ok=True)
         config.nvchecker_run_dir.mkdir(parents=True, exist_ok=True)
         config.artifacts_dir_base.mkdir(parents=True, exist_ok=True)
-        logger.debug(f"  Base build dir: {config.base_build_dir}")
-        logger.debug(f"  Nvchecker run dir: {config.nvchecker_run_dir}")
-        logger.debug(f"  Artifacts base dir: {config.artifacts_dir_base}")
+        logger.debug("  Base build dir: %s", config.base_build_dir)
+        logger.debug("  Nvchecker run dir: %s", config.nvchecker_run_dir)
+        logger.debug("  Artifacts base dir: %s", config.artifacts_dir_base)
     except OSError as e:
         logger.critical(f"Failed to create essential directories: {e}", exc_info=True)
         raise ArchPackageUpdaterError(f"Directory creation failed: {e}") from e
@@ -121,16 +151,26 @@ def run_main_workflow(config: BuildConfiguration):
     # --- Phase 1: AUR State & Global Upstream Check ---
     logger.info("--- Phase 1: Gathering AUR State & Scanning Workspace for nvchecker configs ---")
     
-    potential_pkgs_in_workspace: List[PotentialPackage] = find_potential_packages(config) # From workspace_scanner
+    # Workspace scan, AUR fetch, and keyfile generation are independent
+    # I/O-bound steps; run them concurrently to cut Phase 1 wall-clock time.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        scan_future = executor.submit(find_potential_packages, config) # From workspace_scanner
+        aur_future = executor.submit(fetch_maintained_packages, config.aur_maintainer_name)
+        keyfile_future = executor.submit(nv_client.generate_keyfile)
+        # .result() re-raises any worker exception in this thread. The AUR
+        # result is consumed straight into the pkgbase-keyed map — no interim
+        # list binding; downstream users iterate the map's values.
+        potential_pkgs_in_workspace: List[PotentialPackage] = scan_future.result()
+        aur_pkgs_map: Dict[str, AURPackageInfo] = {p.pkgbase: p for p in aur_future.result()}
+        keyfile_path = keyfile_future.result()
+
     if not potential_pkgs_in_workspace:
         logger.warning("No potential packages (PKGBUILDs with optional .nvchecker.toml) found. Exiting.")
         return
 
-    aur_maintained_pkgs: List[AURPackageInfo] = fetch_maintained_packages(config.aur_maintainer_name)
-    aur_pkgs_map: Dict[str, AURPackageInfo] = {pkg.pkgbase: pkg for pkg in aur_maintained_pkgs}
-    logger.info(f"Found {len(aur_maintained_pkgs)} packages for '{config.aur_maintainer_name}' on AUR.")
+    logger.info("Found %d packages for '%s' on AUR.", len(aur_pkgs_map), config.aur_maintainer_name)
 
-    aur_snapshot_path = nv_client.generate_aur_snapshot_json(aur_maintained_pkgs)
+    aur_snapshot_path = nv_client.generate_aur_snapshot_json(aur_pkgs_map.values())
     global_upstream_versions_path = config.nvchecker_run_dir / "upstream_versions.json" # Conceptual target
     
     global_nv_config_path = nv_client.prepare_global_nvchecker_config(
@@ -138,7 +178,11 @@ def run_main_workflow(config: BuildConfiguration):
         aur_snapshot_path,
         global_upstream_versions_path
     )
-    keyfile_path = nv_client.generate_keyfile()
+    if global_nv_config_path is None:
+        # No .nvchecker.toml files aggregated; spawning nvchecker would be
+        # a no-op fork/exec.
+        logger.info("No nvchecker configs to check globally. Exiting.")
+        return
 
     globally_updated_versions_map: Dict[str, str] = nv_client.run_global_check_and_get_updates(
         global_nv_config_path, keyfile_path
@@ -147,137 +191,114 @@ def run_main_workflow(config: BuildConfiguration):
     if not globally_updated_versions_map:
         logger.info("Global nvchecker: No packages found with upstream updates compared to AUR.")
         return
-    logger.info(f"Global nvchecker: Identified {len(globally_updated_versions_map)} package(s) with upstream updates: {list(globally_updated_versions_map.keys())}")
+    logger.info("Global nvchecker: Identified %d package(s) with upstream updates: %s",
+                len(globally_updated_versions_map), list(globally_updated_versions_map.keys()))
 
-    # --- Phase 2: Task Creation & Detailed Parsing (Only for updated packages) ---
-    logger.info("--- Phase 2: Creating Update Tasks & Parsing Specific PKGBUILDs ---")
-    tasks_to_process: List[PackageUpdateTask] = []
+    # --- Phase 2: Detailed Parsing (Only for updated packages) ---
+    logger.info("--- Phase 2: Parsing PKGBUILDs for Updated Packages ---")
 
-    # Need a way to map pkgbase from nvchecker output back to its PotentialPackage/PKGBUILD path
-    # This assumes pkgbase from nvchecker matches the directory name or a pkgbase var in PKGBUILD.
-    # A robust way: iterate potential_pkgs_in_workspace, if its .nvchecker.toml outputted a pkg_name
-    # that is in globally_updated_versions_map, then parse it.
-    # For now, assume keys in globally_updated_versions_map are pkgbases we can find a PKGBUILD for.
-
-    # Create a map of pkgbuild_path by assumed pkgbase (e.g., parent directory name)
-    # This is a simplification; a more robust mapping might be needed if dir name != pkgbase
+    # Map pkgbase from nvchecker output back to its PKGBUILD path. The
+    # scanner fills pkgbase from the PKGBUILD text (directory-name fallback
+    # already applied there), so no Path.parent.name walks happen here.
     pkgbuild_paths_by_pkgbase: Dict[str, Path] = {
-        pp.pkgbuild_path.parent.name: pp.pkgbuild_path for pp in potential_pkgs_in_workspace
+        pp.pkgbase: pp.pkgbuild_path for pp in potential_pkgs_in_workspace
     }
 
+    # Parse only the PKGBUILDs that actually have an upstream update. The
+    # C-level dict-view intersection replaces a per-key lookup loop, and the
+    # unmatched names surface as one aggregated warning via the difference.
+    actionable_pkgbases = globally_updated_versions_map.keys() & pkgbuild_paths_by_pkgbase.keys()
+    unmatched = globally_updated_versions_map.keys() - actionable_pkgbases
+    if unmatched:
+        logger.warning("Found update(s) with no matching PKGBUILD path (skipped): %s",
+                       ", ".join(sorted(unmatched)))
+    parse_targets: Dict[str, Path] = {
+        pkgbase: pkgbuild_paths_by_pkgbase[pkgbase] for pkgbase in actionable_pkgbases
+    }
 
-    for pkgbase_to_update, new_upstream_ver_str in globally_updated_versions_map.items():
-        logger.info(f"Processing '{pkgbase_to_update}' identified for update to '{new_upstream_ver_str}'.")
-        
-        pkgbuild_file_to_parse = pkgbuild_paths_by_pkgbase.get(pkgbase_to_update)
-        if not pkgbuild_file_to_parse:
-            logger.warning(f"Found update for '{pkgbase_to_update}', but could not find its PKGBUILD path. Skipping.")
-            continue
-
-        logger.info(f"Parsing PKGBUILD for '{pkgbase_to_update}' at: {pkgbuild_file_to_parse}")
-        # Pass config for builder_home_dir if parse_pkgbuild_srcinfo needs it for permissions
-        # Assuming parse_pkgbuild_srcinfo can get builder_home from config if necessary
-        # or that the current user has makepkg rights.
-        # For the permissions issue, you might pass config.builder_user_home to parse_pkgbuild_srcinfo
-        # which would then be used if makepkg is run via sudo -u builder HOME=...
-        pkg_data: Optional[PKGBUILDData] = parse_pkgbuild_srcinfo(
-            pkgbuild_file_to_parse,
-            # builder_home_dir=config.builder_user_home_if_defined # Example
-        )
-
-        if not pkg_data:
-            logger.error(f"Failed to parse PKGBUILD for '{pkgbase_to_update}'. Skipping task creation.")
-            continue
-        
-        # Quick check if parsed pkgbase matches expected pkgbase
-        if pkg_data.pkgbase != pkgbase_to_update:
-            logger.warning(f"Parsed pkgbase '{pkg_data.pkgbase}' for {pkgbuild_file_to_parse.parent.name} "
-                           f"does not match expected '{pkgbase_to_update}' from nvchecker. Using parsed: '{pkg_data.pkgbase}'.")
-            # This might indicate an issue with how nvchecker keys map to PKGBUILDs.
-            # For now, we trust the parsed pkg_data.pkgbase for the task.
-
-        aur_info = aur_pkgs_map.get(pkg_data.pkgbase) # Use parsed pkgbase
-
-        # Additional check: Is the new upstream version really newer than AUR?
-        # (nvchecker global check should've done this, but a re-check is fine)
-        if aur_info and PkgVersion.from_string(new_upstream_ver_str).pkgver == aur_info.version_obj.pkgver:
-            # This comparison is basic; a proper version object comparison is better.
-            # For simplicity, if pkgvers match, assume it might not need an update unless forced.
-            logger.info(f"Package '{pkg_data.pkgbase}' target upstream version '{new_upstream_ver_str}' "
-                        f"matches current AUR pkgver '{aur_info.version_obj.pkgver}'. "
-                        "Task will still be created; PackageUpdater will make final decision.")
-
-        task = PackageUpdateTask(
-            pkgbuild_data=pkg_data,
-            aur_info=aur_info,
-            target_upstream_ver_str=new_upstream_ver_str
-        )
-        tasks_to_process.append(task)
-        logger.info(f"Created task for '{pkg_data.display_name}' to target version '{new_upstream_ver_str}'.")
+    # All srcinfo generation happens in one batched subprocess: a single
+    # shell loop prints every package's srcinfo, so N packages cost one
+    # fork/exec pair instead of 2N (bash + makepkg each).
+    workspace_pkgs_map: Dict[str, PKGBUILDData] = {}
+    if parse_targets:
+        logger.info("Parsing %d PKGBUILD(s) for updated packages in one batched makepkg pass...", len(parse_targets))
+        parsed_by_path = parse_pkgbuild_srcinfos_batch(list(parse_targets.values()))
+        for pkgbase_to_update, pkgbuild_file_to_parse in parse_targets.items():
+            pkg_data: Optional[PKGBUILDData] = parsed_by_path.get(pkgbuild_file_to_parse)
+            if not pkg_data:
+                logger.error("Failed to parse PKGBUILD for '%s'. Skipping task creation.", pkgbase_to_update)
+                continue
+
+            # Quick check if parsed pkgbase matches expected pkgbase
+            if pkg_data.pkgbase != pkgbase_to_update:
+                logger.warning("Parsed pkgbase '%s' for %s does not match expected '%s' from nvchecker. "
+                               "Keying by nvchecker name '%s'.",
+                               pkg_data.pkgbase, pkgbuild_file_to_parse.parent.name,
+                               pkgbase_to_update, pkgbase_to_update)
+            workspace_pkgs_map[pkgbase_to_update] = pkg_data
 
     # --- Phase 3: Task Creation ---
     logger.info("--- Phase 3: Creating Update Tasks ---")
     tasks_to_process: List[PackageUpdateTask] = create_update_tasks(
-        globally_updated_versions, workspace_pkgs_map, aur_pkgs_map
+        globally_updated_versions_map, workspace_pkgs_map, aur_pkgs_map
     )
 
     if not tasks_to_process:
         logger.info("No actionable update tasks created after filtering. Workflow finished.")
         return
-    logger.info(f"Created {len(tasks_to_process)} tasks for package processing.")
+    logger.info("Created %d tasks for package processing.", len(tasks_to_process))
 
     # --- Phase 4: Individual Package Processing ---
     logger.info("--- Phase 4: Processing Individual Package Updates ---")
-    all_build_results: List[BuildResult] = []
+    # process_many fans the tasks out over a worker-process pool (results
+    # come back in task order, with worker crashes folded into failed
+    # BuildResults), so packages build in parallel instead of serially.
+    all_build_results: List[BuildResult] = updater.process_many(tasks_to_process)
     overall_success = True
 
-    for i, task in enumerate(tasks_to_process):
-        logger.info(f"Processing task {i+1}/{len(tasks_to_process)}: Package '{task.pkgbuild_data.display_name}' "
-                    f"Targeting version: {task.target_upstream_ver_str or 'latest'}")
-        try:
-            build_result = updater.process_package(task)
-            all_build_results.append(build_result)
-            if build_result.success:
-                logger.info(f"Successfully processed '{task.pkgbuild_data.display_name}'. Version: {build_result.new_version}. Actions: {', '.join(build_result.actions_taken)}")
-            else:
-                overall_success = False
-                logger.error(f"Failed to process '{task.pkgbuild_data.display_name}': {build_result.message} "
-                             f"{build_result.error_details or ''}")
-        except Exception as e: # Catch unexpected errors from process_package itself
+    for task, build_result in zip(tasks_to_process, all_build_results):
+        if build_result.success:
+            logger.info("Successfully processed '%s'. Version: %s. Actions: %s",
+                        task.pkgbuild_data.display_name, build_result.new_version,
+                        ', '.join(build_result.actions_taken))
+        else:
             overall_success = False
-            logger.critical(f"Critical error during processing of '{task.pkgbuild_data.display_name}': {e}", exc_info=True)
-            # Create a BuildResult for this catastrophic failure
-            error_result = BuildResult(
-                package_name=task.pkgbuild_data.display_name,
-                success=False,
-                message="Critical error during package processing.",
-                error_details=str(e)
-            )
-            all_build_results.append(error_result)
-        logger.info("-" * 60) # Separator between package processing logs
+            logger.error("Failed to process '%s': %s %s",
+                         task.pkgbuild_data.display_name, build_result.message,
+                         build_result.error_details or '')
 
     # --- Phase 5: Reporting & Summary ---
     logger.info("--- Phase 5: Workflow Summary ---")
     successful_updates = sum(1 for r in all_build_results if r.success)
     failed_updates = len(all_build_results) - successful_updates
 
-    logger.info(f"Total tasks processed: {len(all_build_results)}")
-    logger.info(f"Successful updates: {successful_updates}")
-    logger.info(f"Failed updates: {failed_updates}")
+    logger.info("Total tasks processed: %d", len(all_build_results))
+    logger.info("Successful updates: %d", successful_updates)
+    logger.info("Failed updates: %d", failed_updates)
 
-    # Detailed summary using GitHub Actions log grouping
+    # Detailed summary using GitHub Actions log grouping. The whole block is
+    # assembled in memory and emitted with one write: a single syscall and
+    # handler acquisition instead of several per package.
     if all_build_results:
-        print("::group::Detailed Package Results Summary") # Start GHA group
+        buf = io.StringIO()
+        buf.write("::group::Detailed Package Results Summary\n")
         for res in all_build_results:
             status_icon = "✅" if res.success else "❌"
-            log_func = logger.info if res.success else logger.error
-            log_func(f"{status_icon} Package: {res.package_name}")
-            if res.old_version: log_func(f"  Old Version: {res.old_version}")
-            if res.new_version: log_func(f"  New Version: {res.new_version}")
-            if res.actions_taken: log_func(f"  Actions: {', '.join(res.actions_taken)}")
-            if not res.success: log_func(f"  Message: {res.message}")
-            if res.error_details: log_func(f"  Error Details: {res.error_details}")
-        print("::endgroup::") # End GHA group
+            buf.write(f"{status_icon} Package: {res.package_name}\n")
+            if res.old_version: buf.write(f"  Old Version: {res.old_version}\n")
+            if res.new_version: buf.write(f"  New Version: {res.new_version}\n")
+            if res.actions_taken: buf.write(f"  Actions: {', '.join(res.actions_taken)}\n")
+            if not res.success: buf.write(f"  Message: {res.message}\n")
+            if res.error_details: buf.write(f"  Error Details: {res.error_details}\n")
+        buf.write("::endgroup::\n")
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
+        # Failures still go through the logger so they surface as GHA
+        # ::error annotations, not just lines inside the collapsed group.
+        for res in all_build_results:
+            if not res.success:
+                logger.error("Package '%s' failed: %s %s",
+                             res.package_name, res.message, res.error_details or '')
 
     if not overall_success:
         logger.error("One or more packages failed to process. See logs for details.")
@@ -315,7 +336,7 @@ def main_cli_entry_function():
         print(f"CRITICAL CONFIGURATION ERROR: {e}", file=sys.stderr)
         # For GHA, try to emit a GHA error command
         if os.getenv("GITHUB_ACTIONS") == "true":
-            print(f"::error title=ConfigurationError::{str(e).replace('%', '%25').replace('\r', '%0D').replace('\n', '%0A')}", file=sys.stderr)
+            print(f"::error title=ConfigurationError::{str(e).translate(_GHA_TRANS)}", file=sys.stderr)
         exit_code = 1
     except Exception as e:
         # Catch any other truly unexpected errors.
@@ -2,10 +2,16 @@
 models.py - Core data structures for the Arch Package Updater.
 """
 import re
+import sys
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 
+# Single pass over "epoch:pkgver-pkgrel": one compiled match replaces the
+# ':' containment check, the split, and a per-call re-cache lookup.
+_VERSION_RE = re.compile(r'^(?:([^:]+):)?(.+?)-([^-]+)$')
+
 # --- Configuration Models ---
 
 @dataclass(frozen=True) # Configuration should generally be immutable after loading
@@ -40,7 +46,7 @@ class BuildConfiguration:
 
 # --- Package Information Models ---
 
-@dataclass
+@dataclass(slots=True)
 class PkgVersion:
     """Represents a package version, including pkgver, pkgrel, and epoch."""
     pkgver: str
@@ -48,32 +54,49 @@ class PkgVersion:
     pkgbase: str = ""
     epoch: Optional[str] = None
 
+    def __post_init__(self):
+        # These short strings are compared and hashed constantly; interning
+        # lets equality hit the pointer-identity fast path.
+        self.pkgver = sys.intern(self.pkgver)
+        self.pkgrel = sys.intern(self.pkgrel)
+        if self.pkgbase:
+            self.pkgbase = sys.intern(self.pkgbase)
+
     def __str__(self) -> str:
-        version_str = ""
+        # One BUILD_STRING per call instead of three conditional concats.
+        # pkgrel should always be present for a full version; the bare-pkgver
+        # forms are kept for defensiveness.
         if self.epoch:
-            version_str += f"{self.epoch}:"
-        version_str += self.pkgver
-        if self.pkgrel: # Should always be present for a full version
-            version_str += f"-{self.pkgrel}"
-        return version_str
+            return f"{self.epoch}:{self.pkgver}-{self.pkgrel}" if self.pkgrel else f"{self.epoch}:{self.pkgver}"
+        return f"{self.pkgver}-{self.pkgrel}" if self.pkgrel else self.pkgver
+
+    @classmethod
+    def _from_interned(cls, pkgver: str, pkgrel: str, epoch: Optional[str]) -> 'PkgVersion':
+        """Builds a PkgVersion from fields that are already interned,
+        bypassing __init__/__post_init__ and their redundant intern calls."""
+        obj = cls.__new__(cls)
+        obj.pkgver = pkgver
+        obj.pkgrel = pkgrel
+        obj.pkgbase = ""
+        obj.epoch = epoch
+        return obj
 
     @classmethod
     def from_string(cls, version_string: str) -> 'PkgVersion':
         """
         Parses a full version string like "epoch:pkgver-pkgrel" or "pkgver-pkgrel".
         """
+        match = _VERSION_RE.match(version_string) # pkgrel is usually numeric but can be complex
+        if match:
+            epoch, pkgver, pkgrel = match.groups()
+            return cls(pkgver=pkgver, pkgrel=pkgrel, epoch=epoch)
+
+        # Fallback: no pkgrel separator; the whole string (after epoch) is
+        # pkgver, pkgrel is "1". This might happen for upstream versions.
         epoch: Optional[str] = None
         if ':' in version_string:
             epoch, version_string = version_string.split(':', 1)
-
-        match = re.match(r'(.+?)-([^-]+)$', version_string) # pkgrel is usually numeric but can be complex
-        if match:
-            pkgver, pkgrel = match.group(1), match.group(2)
-            return cls(pkgver=pkgver, pkgrel=pkgrel, epoch=epoch)
-        else:
-            # Fallback: assume the whole string (after epoch) is pkgver, pkgrel is "1"
-            # This might happen for upstream versions without a pkgrel
-            return cls(pkgver=version_string, pkgrel="1", epoch=epoch)
+        return cls(pkgver=version_string, pkgrel="1", epoch=epoch)
 
 
 @dataclass
@@ -106,9 +129,43 @@ class PKGBUILDData:
     # Path to the associated .nvchecker.toml, relative to workspace or absolute
     nvchecker_config_path_relative: Optional[str] = None
 
-    @property
+    # Raw PKGBUILD text captured at parse time, so the update step can edit
+    # it without a second disk read. None when unavailable; set to None again
+    # once the file on disk has been rewritten (the copy is then stale).
+    pkgbuild_text: Optional[str] = None
+
+    # No slots here: the cached version property needs an instance __dict__.
+    def __post_init__(self):
+        if self.pkgbase:
+            self.pkgbase = sys.intern(self.pkgbase)
+        if self.pkgver:
+            self.pkgver = sys.intern(self.pkgver)
+        if self.pkgrel:
+            self.pkgrel = sys.intern(self.pkgrel)
+
+    @cached_property
     def current_version_obj(self) -> PkgVersion:
-        return PkgVersion(pkgver=self.pkgver, pkgrel=self.pkgrel, epoch=self.epoch)
+        # Accessed several times per package (logging, comparisons, str());
+        # cache the constructed PkgVersion on the instance after first use.
+        # __post_init__ already interned these fields, so the fast-path
+        # constructor skips the dataclass __init__ entirely.
+        return PkgVersion._from_interned(self.pkgver, self.pkgrel, self.epoch)
+
+    def invalidate_version(self) -> None:
+        """Drops the cached version object after pkgver/pkgrel/epoch change."""
+        self.__dict__.pop('current_version_obj', None)
+
+    @cached_property
+    def local_source_filenames(self) -> List[str]:
+        # Filenames from source= entries that live in the package dir (not
+        # URLs); computed once here rather than re-splitting each entry on
+        # the per-package commit path.
+        out: List[str] = []
+        for entry in self.source:
+            if "://" in entry or entry.startswith("git+"):
+                continue
+            out.append(entry.split("::", 1)[0])
+        return out
 
     @property
     def display_name(self) -> str:
@@ -128,13 +185,21 @@ class AURPackageInfo:
     popularity: Optional[float] = None
     last_modified_timestamp: Optional[int] = None
 
-    @property
+    # No slots here either (cached version_obj lives in __dict__), but the
+    # key fields used in pkgbase-keyed maps are interned.
+    def __post_init__(self):
+        self.pkgbase = sys.intern(self.pkgbase)
+        self.name = sys.intern(self.name)
+
+    @cached_property
     def version_obj(self) -> PkgVersion:
+        # Parsing runs the version regex; cache it so repeated accesses in
+        # task creation and logging cost a dict load, not a re-parse.
         return PkgVersion.from_string(self.version_str)
 
 # --- Task and Result Models ---
 
-@dataclass
+@dataclass(slots=True)
 class PackageUpdateTask:
     """Represents a package to be processed for updates."""
     pkgbuild_data: PKGBUILDData              # Data from the local PKGBUILD/.SRCINFO
@@ -143,7 +208,7 @@ class PackageUpdateTask:
     # This is the version we aim to update the PKGBUILD to.
     target_upstream_ver_str: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class BuildResult:
     """Result of processing a single package update task."""
     package_name: str
@@ -158,7 +223,7 @@ class BuildResult:
 
 
 # --- Utility Models (can also be in utils.py) ---
-@dataclass
+@dataclass(slots=True)
 class SubprocessResult:
     """Result of a subprocess execution."""
     returncode: int
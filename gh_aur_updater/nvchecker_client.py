@@ -1,23 +1,73 @@
 """
 nvchecker_client.py - Wraps nvchecker and nvcmp command-line tools.
 """
+import asyncio
+import concurrent.futures
+import hashlib
 import logging
 import json
+import mmap
 import os
+import re
+import selectors
+import subprocess
+import tempfile
 from pathlib import Path
 from typing import List, Dict, Optional, Callable
 
 from .models import BuildConfiguration, AURPackageInfo, PKGBUILDData, SubprocessResult
 from .exceptions import ArchPackageUpdaterError
+from .workspace_scanner import PotentialPackage
+
+try:
+    import orjson # C-accelerated decode for the per-line JSON event stream
+except ImportError:
+    orjson = None
 # Assuming utils.py contains run_subprocess and is in the same package level
 # from .utils import run_subprocess 
 
 logger = logging.getLogger(__name__)
 
+# Single pattern matching version information in nvchecker's default stderr
+# logging, compiled once at import. The named groups say which branch hit,
+# so each line costs one engine invocation instead of two.
+# Example: "[I M D H:M:S module:LINE] pkgname: updated to 1.2.3"
+# Example: "[I M D H:M:S module:LINE] pkgname: current 1.2.3"
+_VER_RE = re.compile(r":\s*(?:(?P<upd>updated to)|(?P<cur>current))\s+([^\s,]+)", re.IGNORECASE)
+
+# Event-line decoder resolved once at import rather than per run. Bare
+# json.loads already reuses json's cached default JSONDecoder, so the win
+# here is hoisting the orjson-vs-stdlib choice out of the hot loop.
+_loads = orjson.loads if orjson is not None else json.loads
+
 # Type alias for the subprocess runner function for clarity
 SubprocessRunnerFunc = Callable[[List[str], Optional[Path | str], Optional[Dict[str, str]], bool, bool, Optional[str]], SubprocessResult]
 
 
+def _write_atomic(path: Path, data: bytes, mode: int = 0o644) -> None:
+    """Atomically replaces path with data, with the requested permissions.
+
+    Writes to a same-directory temp file (created 0o600 by mkstemp),
+    fchmods it to the final mode, then renames over the target: readers
+    never observe a partial file, and the keyfile's token can't leak
+    through a pre-existing target's retained world-readable permissions."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.fspath(path)) or ".",
+                                    prefix=f".{path.name}.")
+    try:
+        try:
+            os.fchmod(fd, mode)
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 class NvCheckerClient:
     """
     Client for interacting with nvchecker and nvcmp.
@@ -32,19 +82,24 @@ class NvCheckerClient:
         File is created in config.nvchecker_run_dir.
         """
         output_path = self.config.nvchecker_run_dir / "aur.json"
-        aur_data: Dict[str, str] = {}
-        for pkg_info in aur_packages:
-            # nvchecker typically uses pkgbase as the key.
-            # The version string should be just "pkgver" for comparison if epoch/release handled by nvchecker itself.
-            # However, for comparing against AUR, using the full version string from AUR is common.
-            # Let's use the full version string from AURPackageInfo.
-            aur_data[pkg_info.pkgbase] = str(pkg_info.version_obj) # Uses PkgVersion.__str__
+        # nvchecker typically uses pkgbase as the key.
+        # The version string should be just "pkgver" for comparison if epoch/release handled by nvchecker itself.
+        # However, for comparing against AUR, using the full version string from AUR is common.
+        # Comprehension runs the loop at C speed; each version is stringified
+        # exactly once per snapshot (PkgVersion.__str__).
+        aur_data: Dict[str, str] = {p.pkgbase: str(p.version_obj) for p in aur_packages}
 
         logger.info(f"Generating AUR snapshot (oldVer) at: {output_path}")
         try:
-            with open(output_path, 'w') as f:
-                json.dump(aur_data, f, indent=2, sort_keys=True)
-            logger.debug(f"aur.json content: {json.dumps(aur_data, indent=2, sort_keys=True)}")
+            # Serialize once to bytes; the debug log reuses the same buffer
+            # instead of a second full dumps pass.
+            if orjson is not None:
+                payload = orjson.dumps(aur_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(aur_data, indent=2, sort_keys=True).encode()
+            _write_atomic(output_path, payload)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("aur.json content: %s", payload.decode())
         except IOError as e:
             logger.error(f"Failed to write aur.json to {output_path}: {e}", exc_info=True)
             raise ArchPackageUpdaterError(f"IOError writing aur.json: {e}") from e
@@ -54,48 +109,78 @@ class NvCheckerClient:
         potential_workspace_packages: List[PotentialPackage], # CHANGED
         aur_json_path: Path,
         upstream_versions_json_path: Path # Target for newver if used by nvchecker itself
-    ) -> Path:
+    ) -> Optional[Path]:
         global_config_path = self.config.nvchecker_run_dir / "new.toml"
         logger.info(f"Preparing global nvchecker configuration at: {global_config_path}")
 
-        config_content = f"[__config__]\n"
-        config_content += f"oldver = \"{aur_json_path.resolve()}\"\n"
         # If nvchecker --logger json is parsed directly, newver in config isn't strictly for output.
         # It could be a conceptual path or not set if direct parsing is used.
         # For now, keep it as it's common practice for nvchecker file setups.
-        config_content += f"newver = \"{upstream_versions_json_path.resolve()}\"\n\n"
+        # realpath over fspath yields a str directly; Path.resolve() would
+        # build a Path only for the f-string to stringify again.
+        oldver = os.path.realpath(os.fspath(aur_json_path))
+        newver = os.path.realpath(os.fspath(upstream_versions_json_path))
+        header = (f"[__config__]\n"
+                  f"oldver = \"{oldver}\"\n"
+                  f"newver = \"{newver}\"\n\n")
+
+        # Resolve the workspace root once; per-package paths are composed
+        # textually with normpath instead of Path.resolve()'s stat walk over
+        # every component for every package.
+        ws_root = str(self.config.github_workspace.resolve())
 
         aggregated_count = 0
-        for pot_pkg in potential_workspace_packages: # CHANGED
-            if pot_pkg.nvchecker_config_path_relative:
-                abs_nvchecker_path = (self.config.github_workspace / pot_pkg.nvchecker_config_path_relative).resolve()
-                if abs_nvchecker_path.is_file():
+        # Packagers often share one .nvchecker.toml template across sibling
+        # packages; hashing each fragment lets byte-identical bodies (whose
+        # sections nvchecker would otherwise see twice) be emitted once.
+        seen_fragments: Dict[bytes, str] = {}
+        try:
+            # Stream each chunk straight to the open file rather than growing
+            # one big string with += (quadratic bytes moved over many TOMLs).
+            # Binary mode lets copyfileobj pump each TOML's bytes at C speed
+            # without a decode/encode round-trip; content is UTF-8 either way.
+            with open(global_config_path, 'wb') as f:
+                f.write(header.encode())
+                for pot_pkg in potential_workspace_packages: # CHANGED
+                    pkg_display_name = pot_pkg.pkgbuild_path.parent.name # Use parent dir name as temp display
+                    if not pot_pkg.nvchecker_config_path_relative:
+                        logger.debug(f"No .nvchecker.toml specified for {pkg_display_name}, skipping aggregation.")
+                        continue
+                    abs_nvchecker_path = os.path.normpath(
+                        os.path.join(ws_root, pot_pkg.nvchecker_config_path_relative))
+                    # The scanner already stat'ed this file when it recorded
+                    # the path; trust that and let open() report a racy
+                    # deletion rather than paying an isfile stat per package.
                     try:
-                        pkg_display_name = pot_pkg.pkgbuild_path.parent.name # Use parent dir name as temp display
                         logger.debug(f"Appending content from: {abs_nvchecker_path} for potential pkg in {pkg_display_name}")
-                        config_content += f"# --- Config for {pkg_display_name} from {pot_pkg.nvchecker_config_path_relative} ---\n"
-                        config_content += abs_nvchecker_path.read_text()
-                        config_content += "\n\n"
+                        f.write(f"# --- Config for {pkg_display_name} from {pot_pkg.nvchecker_config_path_relative} ---\n".encode())
+                        with open(abs_nvchecker_path, 'rb') as src:
+                            if os.fstat(src.fileno()).st_size > 0:
+                                # Hand the page cache straight to write();
+                                # mmap rejects zero-byte files, hence the guard.
+                                with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                                    fragment_hash = hashlib.blake2b(mm, digest_size=16).digest()
+                                    first_owner = seen_fragments.setdefault(fragment_hash, pkg_display_name)
+                                    if first_owner is pkg_display_name:
+                                        f.write(mm)
+                                    else:
+                                        f.write(f"# identical to config for {first_owner}; body emitted once above\n".encode())
+                        f.write(b"\n\n")
                         aggregated_count += 1
+                    except FileNotFoundError:
+                        logger.warning(f".nvchecker.toml for {pkg_display_name} not found at resolved path: {abs_nvchecker_path}")
                     except IOError as e:
                         logger.warning(f"Could not read .nvchecker.toml for {pkg_display_name} at {abs_nvchecker_path}: {e}")
-                else:
-                    logger.warning(f".nvchecker.toml for {pkg_data.display_name} not found at resolved path: {abs_nvchecker_path}")
-            else:
-                logger.debug(f"No .nvchecker.toml specified for {pkg_data.display_name}, skipping aggregation.")
+        except IOError as e:
+            logger.error(f"Failed to write global nvchecker config to {global_config_path}: {e}", exc_info=True)
+            raise ArchPackageUpdaterError(f"IOError writing new.toml: {e}") from e
 
         if aggregated_count == 0:
+            # Nothing to check: returning None lets the caller skip the
+            # nvchecker fork/exec for an empty workload entirely.
             logger.warning("No .nvchecker.toml files were found or aggregated for the global check.")
-            # Depending on desired behavior, could raise error or return None
-            # For now, create an empty (but valid with __config__) new.toml
+            return None
 
-        try:
-            with open(global_config_path, 'w') as f:
-                f.write(config_content)
-        except IOError as e:
-            logger.error(f"Failed to write global nvchecker config to {global_config_path}: {e}", exc_info=True)
-            raise ArchPackageUpdaterError(f"IOError writing new.toml: {e}") from e
-        
         logger.info(f"Global nvchecker configuration generated with {aggregated_count} individual configs.")
         return global_config_path
 
@@ -112,13 +197,9 @@ class NvCheckerClient:
         
         logger.info(f"Generating nvchecker keyfile at: {keyfile_path}")
         try:
-            with open(keyfile_path, 'w') as f:
-                f.write(keyfile_content)
-            # Set restrictive permissions for keyfile if possible (best effort)
-            try:
-                os.chmod(keyfile_path, 0o600)
-            except OSError as e:
-                logger.warning(f"Could not set permissions on keyfile {keyfile_path}: {e}")
+            # 0o600 at creation: no chmod syscall and no window where the
+            # token sits in a world-readable file.
+            _write_atomic(keyfile_path, keyfile_content.encode(), mode=0o600)
         except IOError as e:
             logger.error(f"Failed to write keyfile.toml to {keyfile_path}: {e}", exc_info=True)
             raise ArchPackageUpdaterError(f"IOError writing keyfile.toml: {e}") from e
@@ -141,39 +222,82 @@ class NvCheckerClient:
             command.extend(["-k", str(keyfile_path)])
 
         logger.info(f"Running global nvchecker check with config: {global_nvchecker_config_path}")
-        
+
         try:
             # nvchecker with --logger json streams JSON objects, one per line.
-            # check=False because nvchecker might exit non-zero if some sources fail but others succeed.
-            result = self.run_subprocess(command, cwd=self.config.nvchecker_run_dir, check=False)
-            
+            # Consume stdout straight off the pipe so each event is parsed
+            # while nvchecker is still busy with its network checks, instead
+            # of buffering the whole log and parsing after exit. The pipe
+            # stays in binary mode: both orjson and json.loads ingest bytes
+            # directly, so the event stream never pays a str decode (and a
+            # bytes line is far smaller than its PEP-393 str). nvchecker
+            # might exit non-zero if some sources fail but others succeed,
+            # so the return code is only warned about.
+            process = subprocess.Popen(
+                command,
+                cwd=str(self.config.nvchecker_run_dir),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+
             updated_packages: Dict[str, str] = {}
-            if result.stdout:
-                for line in result.stdout.splitlines():
+            stderr_chunks: List[bytes] = []
+
+            # Poll both pipes with a selector so a chatty stderr can't back
+            # up against the stdout parse (or vice-versa): whichever fd has
+            # data is drained, no drain thread needed.
+            sel = selectors.DefaultSelector()
+            sel.register(process.stdout, selectors.EVENT_READ)
+            sel.register(process.stderr, selectors.EVENT_READ)
+            while sel.get_map():
+                for key, _ in sel.select():
+                    if key.fileobj is process.stderr:
+                        chunk = process.stderr.read1(65536)
+                        if chunk:
+                            stderr_chunks.append(chunk)
+                        else:
+                            sel.unregister(process.stderr)
+                        continue
+
+                    line = process.stdout.readline()
+                    if not line:
+                        sel.unregister(process.stdout)
+                        continue
+                    line = line.strip()
+                    if not line:
+                        continue
+                    # Cheap bytes __contains__ gate: heartbeat/debug lines
+                    # without an event we act on never reach the JSON parser.
+                    if b'"event"' not in line or (
+                            b'"updated"' not in line and b'"error"' not in line):
+                        continue
                     try:
-                        event_data = json.loads(line)
-                        pkg_name = event_data.get("name")
-                        event_type = event_data.get("event")
-                        version = event_data.get("version")
-
-                        if pkg_name and event_type == "updated" and version:
-                            updated_packages[pkg_name] = version
-                            logger.info(f"Global nvchecker: '{pkg_name}' updated to '{version}'.")
-                        elif event_type == "error":
-                            logger.warning(f"Global nvchecker: Error processing '{pkg_name}': {event_data.get('message', 'Unknown error')}")
-
-                    except json.JSONDecodeError:
-                        logger.warning(f"Global nvchecker: Could not decode JSON line: {line}")
-            
-            if result.returncode != 0:
-                 logger.warning(f"Global nvchecker command finished with exit code {result.returncode}. Some checks might have failed. Stderr: {result.stderr}")
-            
+                        event_data = _loads(line)
+                    except ValueError: # JSONDecodeError from either decoder
+                        logger.warning(f"Global nvchecker: Could not decode JSON line: {line.decode(errors='replace')}")
+                        continue
+
+                    pkg_name = event_data.get("name")
+                    event_type = event_data.get("event")
+                    version = event_data.get("version")
+
+                    if pkg_name and event_type == "updated" and version:
+                        updated_packages[pkg_name] = version
+                        logger.info(f"Global nvchecker: '{pkg_name}' updated to '{version}'.")
+                    elif event_type == "error":
+                        logger.warning(f"Global nvchecker: Error processing '{pkg_name}': {event_data.get('message', 'Unknown error')}")
+            sel.close()
+
+            returncode = process.wait()
+
+            if returncode != 0:
+                 logger.warning(f"Global nvchecker command finished with exit code {returncode}. "
+                                f"Some checks might have failed. Stderr: "
+                                f"{b''.join(stderr_chunks).decode(errors='replace')}")
+
             logger.info(f"Global nvchecker check found {len(updated_packages)} packages with upstream updates.")
             return updated_packages
-            
-        except subprocess.CalledProcessError as e: # Should not be hit if check=False
-            logger.error(f"Global nvchecker run failed unexpectedly (CalledProcessError): {e}", exc_info=True)
-            raise ArchPackageUpdaterError(f"Global nvchecker failed: {e}") from e
+
         except Exception as e:
             logger.error(f"An unexpected error occurred during global nvchecker run: {e}", exc_info=True)
             raise ArchPackageUpdaterError(f"Unexpected error in global nvchecker: {e}") from e
@@ -205,35 +329,7 @@ class NvCheckerClient:
             # nvchecker without --logger json usually prints "updated to" on stderr.
             # It might exit 0 even if no update, or non-zero on error/no update depending on exact case.
             result = self.run_subprocess(command, cwd=build_dir_for_nvchecker_run, check=False)
-            
-            # Regex patterns to find version information in nvchecker's default stderr logging
-            # Example: "[I M D H:M:S module:LINE] pkgname: updated to 1.2.3"
-            # Example: "[I M D H:M:S module:LINE] pkgname: current 1.2.3"
-            update_pattern = re.compile(r":\s*updated to\s+([^\s,]+)", re.IGNORECASE)
-            current_pattern = re.compile(r":\s*current\s+([^\s,]+)", re.IGNORECASE)
-
-            latest_version_found: Optional[str] = None
-
-            if result.stderr: # Primary place for version info without --logger json
-                for line in result.stderr.splitlines():
-                    update_match = update_pattern.search(line)
-                    if update_match:
-                        latest_version_found = update_match.group(1)
-                        logger.info(f"Package-specific nvchecker: Found update to '{latest_version_found}' from stderr.")
-                        break # Take the first "updated to" found
-                    
-                    current_match = current_pattern.search(line)
-                    if current_match and not latest_version_found: # Prioritize "updated to"
-                        latest_version_found = current_match.group(1)
-                        logger.info(f"Package-specific nvchecker: Version is current at '{latest_version_found}' from stderr.")
-                        # Do not break, "updated to" might appear later if multiple sources defined.
-                        # This logic might need refinement if a .toml has multiple version sources.
-                        # Usually, for a single package's .toml, the first conclusive result is taken.
-            
-            if result.returncode != 0 and not latest_version_found:
-                 logger.warning(f"Package-specific nvchecker command finished with exit code {result.returncode} and no version info parsed. Stderr: {result.stderr}")
-            
-            return latest_version_found
+            return self._parse_package_check_stderr(result.stderr, result.returncode)
 
         except subprocess.CalledProcessError as e:
             logger.error(f"Package-specific nvchecker run failed (CalledProcessError): {e}", exc_info=True)
@@ -243,3 +339,111 @@ class NvCheckerClient:
             logger.error(f"An unexpected error occurred during package-specific nvchecker run: {e}", exc_info=True)
             # raise ArchPackageUpdaterError(f"Unexpected error in package-specific nvchecker: {e}") from e
             return None
+
+    @staticmethod
+    def _parse_package_check_stderr(stderr: Optional[str], returncode: int) -> Optional[str]:
+        """Extracts the latest version from nvchecker's default stderr logging."""
+        latest_version_found: Optional[str] = None
+
+        if stderr: # Primary place for version info without --logger json
+            # One finditer pass over the whole buffer: the C regex engine
+            # skips the non-matching lines itself, with no splitlines list or
+            # per-line dispatch. Matches arrive in document order, so the
+            # first "updated to" still wins and an earlier "current" is only
+            # a fallback while scanning for a later update.
+            for match in _VER_RE.finditer(stderr):
+                if match.group('upd'):
+                    latest_version_found = match.group(3)
+                    logger.info(f"Package-specific nvchecker: Found update to '{latest_version_found}' from stderr.")
+                    break # Take the first "updated to" found
+                if not latest_version_found: # 'current' branch; prioritize "updated to"
+                    latest_version_found = match.group(3)
+                    logger.info(f"Package-specific nvchecker: Version is current at '{latest_version_found}' from stderr.")
+                    # This logic might need refinement if a .toml has multiple version sources.
+                    # Usually, for a single package's .toml, the first conclusive result is taken.
+
+        if returncode != 0 and not latest_version_found:
+             logger.warning(f"Package-specific nvchecker command finished with exit code {returncode} and no version info parsed. Stderr: {stderr}")
+
+        return latest_version_found
+
+    async def _run_package_specific_check_async(
+        self,
+        package_nvchecker_config_path: Path,
+        keyfile_path: Optional[Path],
+        build_dir_for_nvchecker_run: Path,
+        semaphore: asyncio.Semaphore
+    ) -> Optional[str]:
+        """Async variant of run_package_specific_check; see run_package_specific_checks."""
+        if not package_nvchecker_config_path.is_file():
+            logger.warning(f"Package-specific .nvchecker.toml not found at: {package_nvchecker_config_path}")
+            return None
+
+        command = ["nvchecker", "-c", str(package_nvchecker_config_path)]
+        if keyfile_path and keyfile_path.is_file():
+            command.extend(["-k", str(keyfile_path)])
+
+        try:
+            async with semaphore: # Bound concurrent nvchecker processes
+                proc = await asyncio.create_subprocess_exec(
+                    *command,
+                    cwd=str(build_dir_for_nvchecker_run),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                _, stderr_bytes = await proc.communicate()
+            return self._parse_package_check_stderr(
+                stderr_bytes.decode(errors="replace"), proc.returncode)
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during package-specific nvchecker run: {e}", exc_info=True)
+            return None
+
+    def run_package_specific_check_many(
+        self,
+        pkg_cfgs: List[Path],
+        keyfile_path: Optional[Path],
+        build_dir_for_nvchecker_run: Path
+    ) -> Dict[Path, Optional[str]]:
+        """
+        Fans run_package_specific_check out over a thread pool.
+
+        The threads spend their time blocked in subprocess waits with the
+        GIL released, so N checks run genuinely in parallel. Drop-in for
+        callers holding a list of .nvchecker.toml paths that share one
+        keyfile and run directory; run_package_specific_checks is the
+        asyncio equivalent for heterogeneous (config, keyfile, dir) tuples.
+        """
+        if not pkg_cfgs:
+            return {}
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(32, len(pkg_cfgs))) as executor:
+            results = executor.map(
+                lambda cfg: self.run_package_specific_check(
+                    cfg, keyfile_path, build_dir_for_nvchecker_run),
+                pkg_cfgs)
+            return dict(zip(pkg_cfgs, results))
+
+    def run_package_specific_checks(
+        self,
+        checks: List[tuple],
+        max_concurrency: int = 16
+    ) -> List[Optional[str]]:
+        """
+        Runs several package-specific nvchecker checks concurrently.
+
+        checks: list of (package_nvchecker_config_path, keyfile_path,
+        build_dir_for_nvchecker_run) tuples. The checks are network-bound
+        inside nvchecker, so running them as concurrent subprocesses brings
+        wall time down to roughly the slowest single check; the semaphore
+        caps process/socket usage.
+        """
+        if not checks:
+            return []
+
+        async def _gather() -> List[Optional[str]]:
+            semaphore = asyncio.Semaphore(max_concurrency)
+            return await asyncio.gather(
+                *(self._run_package_specific_check_async(cfg, key, build_dir, semaphore)
+                  for cfg, key, build_dir in checks))
+
+        return asyncio.run(_gather())
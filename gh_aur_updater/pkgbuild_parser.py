@@ -1,6 +1,8 @@
 """
 pkgbuild_parser.py - Parses PKGBUILD metadata using the .SRCINFO method.
 """
+import atexit
+import json
 import logging
 import re
 import os
@@ -8,55 +10,212 @@ import subprocess # Using subprocess directly here for focused error handling
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+try:
+    import pwd
+except ImportError: # Non-POSIX; sudo fallback below is used
+    pwd = None
+
 from .models import PKGBUILDData
 from .exceptions import PKGBUILDParseError
 from .utils import run_subprocess, SubprocessResult # Assuming utils.py and SubprocessResult are available
 
 logger = logging.getLogger(__name__)
 
+# One key = value line of makepkg --printsrcinfo output. finditer over the
+# whole buffer runs in the C regex engine, replacing per-line strip/split;
+# comment and blank lines simply never match.
+_SRCINFO_LINE = re.compile(r"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*)$", re.M)
+
+# Keys that are known to be arrays in .SRCINFO even if they appear once
+# (makepkg --printsrcinfo outputs them one per line for arrays).
+# Frozen at module scope: built once, shared across all parses.
+_SRCINFO_ARRAY_KEYS = frozenset({
+    "pkgname", "arch", "license", "groups",
+    "depends", "makedepends", "checkdepends", "optdepends",
+    "provides", "conflicts", "replaces", "backup",
+    "source", "sha1sums", "sha256sums", "sha384sums", "sha512sums", "md5sums"
+})
+
+
+def _makepkg_user_kwargs() -> Dict[str, int]:
+    """subprocess kwargs to run makepkg directly as 'nobody'.
+
+    When we already run as root (the usual CI case), Popen's user=/group=
+    drops privileges in the forked child, skipping sudo's ~30-80 ms of PAM
+    and audit work per makepkg invocation. Empty when not root or the
+    account is unknown; callers then keep the sudo wrapper.
+    """
+    if pwd is None or os.geteuid() != 0:
+        return {}
+    try:
+        entry = pwd.getpwnam("nobody")
+    except KeyError:
+        return {}
+    return {"user": entry.pw_uid, "group": entry.pw_gid}
+
+
+# Resolved once at import; getpwnam is a files/NSS lookup we shouldn't repeat.
+_MAKEPKG_USER_KWARGS = _makepkg_user_kwargs()
+
+
+def _as_nobody(command: List[str]) -> List[str]:
+    """Prefixes the sudo wrapper only when direct user switching is unavailable."""
+    if _MAKEPKG_USER_KWARGS:
+        return command
+    return ["sudo", "-u", "nobody"] + command
+
+
+class _SrcinfoCache:
+    """
+    Persists makepkg --printsrcinfo output keyed by PKGBUILD path.
+
+    Each makepkg fork costs ~100-500 ms (bash sourcing + sudo); on runs where
+    most PKGBUILDs are unchanged the cache turns those into dict lookups.
+    One entry per path, carrying the file's st_mtime_ns: an edit replaces
+    the entry rather than accumulating stale keys, so the persistent file
+    stays bounded by the number of PKGBUILDs. GH_AUR_UPDATER_CACHE_DIR
+    overrides the cache location (test runs point it at a temp dir).
+    Cache problems are never fatal — they just mean a makepkg run.
+    """
+    def __init__(self, cache_file: Optional[Path] = None):
+        if cache_file is None:
+            cache_root = Path(os.environ.get("GH_AUR_UPDATER_CACHE_DIR")
+                              or os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+            cache_file = cache_root / "gh-aur-updater" / "srcinfo-cache.json"
+        self._path = cache_file
+        self._dirty = False
+        self._data: Dict[str, Dict[str, Any]] = {}
+        try:
+            raw = json.loads(self._path.read_text())
+            # Entries in any older or foreign shape are simply dropped.
+            self._data = {k: v for k, v in raw.items()
+                          if isinstance(v, dict) and "mtime_ns" in v and "srcinfo" in v}
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def get(self, pkgbuild_file_path: Path) -> Optional[str]:
+        try:
+            entry = self._data.get(str(pkgbuild_file_path.resolve()))
+            if entry is not None and entry["mtime_ns"] == pkgbuild_file_path.stat().st_mtime_ns:
+                return entry["srcinfo"]
+        except OSError:
+            pass
+        return None
+
+    def put(self, pkgbuild_file_path: Path, srcinfo_content: str) -> None:
+        try:
+            self._data[str(pkgbuild_file_path.resolve())] = {
+                "mtime_ns": pkgbuild_file_path.stat().st_mtime_ns,
+                "srcinfo": srcinfo_content,
+            }
+            self._dirty = True
+        except OSError:
+            pass
+
+    def flush(self) -> None:
+        if not self._dirty:
+            return
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._path.write_text(json.dumps(self._data))
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Could not persist srcinfo cache to {self._path}: {e}")
+
+
+_srcinfo_cache = _SrcinfoCache()
+atexit.register(_srcinfo_cache.flush)
+
+
 def _parse_srcinfo_content(content: str, pkgbuild_path: Path) -> Dict[str, Any]:
     """
     Parses the raw string content of a .SRCINFO file into a dictionary.
     Handles multi-line values and common array fields.
     """
     data: Dict[str, Any] = {}
-    # Keys that are known to be arrays in .SRCINFO even if they appear once
-    # (makepkg --printsrcinfo outputs them one per line for arrays)
-    array_keys = {
-        "pkgname", "arch", "license", "groups",
-        "depends", "makedepends", "checkdepends", "optdepends",
-        "provides", "conflicts", "replaces", "backup",
-        "source", "sha1sums", "sha256sums", "sha384sums", "sha512sums", "md5sums"
-    }
-
-    for line in content.splitlines():
-        line = line.strip()
-        if not line or line.startswith('#'):
-            continue
-        
-        # Split on the first '='
-        key_value = line.split('=', 1)
-        if len(key_value) != 2:
-            logger.warning(f"Skipping malformed .SRCINFO line in {pkgbuild_path}: '{line}'")
-            continue
-        
-        key, value = key_value[0].strip(), key_value[1].strip()
-
-        if key in array_keys:
-            if key not in data:
-                data[key] = []
-            data[key].append(value)
-        elif key in data: # A non-array key appearing again (should not happen in valid .SRCINFO for scalar values)
-            # If it happens, convert to list and append. This is defensive.
-            if not isinstance(data[key], list):
-                data[key] = [data[key]]
-            data[key].append(value)
-            logger.warning(f"Scalar key '{key}' appeared multiple times in .SRCINFO for {pkgbuild_path}. Treating as array.")
-        else:
-            data[key] = value
-            
+
+    for match in _SRCINFO_LINE.finditer(content):
+        _feed_srcinfo_entry(data, match.group(1), match.group(2).rstrip(), pkgbuild_path)
+
+    return data
+
+
+def _feed_srcinfo_entry(data: Dict[str, Any], key: str, value: str, pkgbuild_path: Path) -> None:
+    """Dispatches one key/value pair into the parsed-srcinfo dict."""
+    if key in _SRCINFO_ARRAY_KEYS:
+        if key not in data:
+            data[key] = []
+        data[key].append(value)
+    elif key in data: # A non-array key appearing again (should not happen in valid .SRCINFO for scalar values)
+        # If it happens, convert to list and append. This is defensive.
+        if not isinstance(data[key], list):
+            data[key] = [data[key]]
+        data[key].append(value)
+        logger.warning(f"Scalar key '{key}' appeared multiple times in .SRCINFO for {pkgbuild_path}. Treating as array.")
+    else:
+        data[key] = value
+
+def _data_from_srcinfo(srcinfo_content: str, pkgbuild_file_path: Path) -> PKGBUILDData:
+    """
+    Converts raw .SRCINFO content into a PKGBUILDData object.
+    Raises PKGBUILDParseError on missing mandatory fields.
+    """
+    parsed_dict = _parse_srcinfo_content(srcinfo_content, pkgbuild_file_path)
+    return _data_from_parsed_dict(parsed_dict, pkgbuild_file_path)
+
+
+def _data_from_parsed_dict(parsed_dict: Dict[str, Any], pkgbuild_file_path: Path) -> PKGBUILDData:
+    """Builds a PKGBUILDData from an already-parsed srcinfo dict."""
+    # .SRCINFO might not have all fields if PKGBUILD is minimal/broken
+    # Default to empty strings or lists where appropriate in PKGBUILDData
+
+    # pkgname in .SRCINFO is always a list, even for single packages
+    pkgname_list = parsed_dict.get("pkgname", [])
+    if not pkgname_list:
+         raise PKGBUILDParseError(
+            pkgbuild_path=str(pkgbuild_file_path),
+            message="Mandatory 'pkgname' not found in .SRCINFO."
+        )
+
+    data = PKGBUILDData(
+        pkgbuild_path=pkgbuild_file_path.resolve(),
+        pkgbase=parsed_dict.get("pkgbase", pkgname_list[0]), # Fallback pkgbase to first pkgname
+        pkgname=pkgname_list,
+        pkgver=parsed_dict.get("pkgver", ""),
+        pkgrel=parsed_dict.get("pkgrel", ""),
+        epoch=parsed_dict.get("epoch"), # Optional
+        pkgdesc=parsed_dict.get("pkgdesc", ""),
+        url=parsed_dict.get("url", ""),
+        arch=parsed_dict.get("arch", []),
+        license=parsed_dict.get("license", []),
+        depends=parsed_dict.get("depends", []),
+        makedepends=parsed_dict.get("makedepends", []),
+        checkdepends=parsed_dict.get("checkdepends", []),
+        optdepends=parsed_dict.get("optdepends", []),
+        provides=parsed_dict.get("provides", []),
+        conflicts=parsed_dict.get("conflicts", []),
+        replaces=parsed_dict.get("replaces", []),
+        source=parsed_dict.get("source", []),
+        sha256sums=parsed_dict.get("sha256sums", [])
+        # Add other checksums and fields as needed
+    )
+
+    # Keep the raw PKGBUILD around so the version-update step can reuse it
+    # instead of re-reading the file. Best effort only.
+    try:
+        data.pkgbuild_text = pkgbuild_file_path.read_text()
+    except OSError:
+        pass
+
+    # Basic validation: pkgver and pkgrel should exist if pkgname does
+    if not data.pkgver or not data.pkgrel:
+        logger.warning(f"Potentially incomplete .SRCINFO for {data.display_name}: pkgver or pkgrel missing.")
+        # Depending on strictness, could raise PKGBUILDParseError here too.
+
+    logger.info(f"Successfully parsed .SRCINFO for {data.display_name} (v{data.current_version_obj})")
     return data
 
+
 def parse_pkgbuild_srcinfo(
     pkgbuild_file_path: Path,
     builder_home_dir: Optional[Path] = None # For setting HOME if makepkg runs as different user
@@ -76,88 +235,72 @@ def parse_pkgbuild_srcinfo(
         logger.error(f"PKGBUILD file not found at: {pkgbuild_file_path}")
         return None
 
+    cached_srcinfo = _srcinfo_cache.get(pkgbuild_file_path)
+    if cached_srcinfo:
+        logger.debug(f"Using cached .SRCINFO for: {pkgbuild_file_path}")
+        try:
+            return _data_from_srcinfo(cached_srcinfo, pkgbuild_file_path)
+        except PKGBUILDParseError as e:
+            logger.error(str(e))
+            return None
+
     pkgbuild_dir = pkgbuild_file_path.parent
     logger.debug(f"Generating .SRCINFO for: {pkgbuild_file_path}")
 
-    command = ["sudo", "-u", "nobody", "makepkg", "--printsrcinfo", "--nocolor", 
-               "BUILDDIR=/tmp", "PKGDEST=/tmp", "SRCDEST=/tmp"]
-    env_vars = os.environ.copy() # Inherit current environment
+    # --printsrcinfo only sources the PKGBUILD; it never stages sources or
+    # packages, so the old BUILDDIR/PKGDEST/SRCDEST=/tmp overrides were dead
+    # weight on the argv.
+    command = _as_nobody(["makepkg", "--printsrcinfo", "--nocolor"])
+    # env=None lets the child inherit the environment directly; only build a
+    # modified copy when HOME actually needs overriding.
+    env_vars = None
     if builder_home_dir:
+        env_vars = os.environ.copy()
         env_vars["HOME"] = str(builder_home_dir)
         # If running makepkg as a different user via sudo, that sudo command
         # in run_subprocess would need to handle -E and -u.
         # For now, assume run_subprocess executes as current user, or env is for current user.
         
     try:
-        # Using subprocess directly for more control over env and potential sudo
-        # If `run_subprocess` from `utils.py` can handle `env` properly, it can be used.
-        # For now, this is more explicit for `makepkg`.
-        process = subprocess.run(
+        # Using subprocess directly for more control over env and potential sudo.
+        # Stream stdout through the tokenizer as makepkg writes it: parsing
+        # overlaps the child's I/O and no second full pass over the buffer is
+        # needed. Raw lines are kept only to persist the srcinfo cache entry.
+        process = subprocess.Popen(
             command,
             cwd=str(pkgbuild_dir), # makepkg needs to run in the PKGBUILD's directory
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            check=False, # We will check returncode manually
-            env=env_vars
+            env=env_vars,
+            **_MAKEPKG_USER_KWARGS
         )
 
-        if process.returncode != 0:
+        parsed_dict: Dict[str, Any] = {}
+        raw_lines: List[str] = []
+        for line in process.stdout:
+            raw_lines.append(line)
+            match = _SRCINFO_LINE.match(line)
+            if match:
+                _feed_srcinfo_entry(parsed_dict, match.group(1), match.group(2).rstrip(), pkgbuild_file_path)
+        stderr_content = process.stderr.read()
+        returncode = process.wait()
+
+        if returncode != 0:
             raise PKGBUILDParseError(
                 pkgbuild_path=str(pkgbuild_file_path),
-                message=f"makepkg --printsrcinfo failed with exit code {process.returncode}.",
-                stderr=process.stderr.strip()
+                message=f"makepkg --printsrcinfo failed with exit code {returncode}.",
+                stderr=stderr_content.strip()
             )
-        
-        srcinfo_content = process.stdout
-        if not srcinfo_content:
+
+        if not raw_lines:
             raise PKGBUILDParseError(
                 pkgbuild_path=str(pkgbuild_file_path),
                 message="makepkg --printsrcinfo produced no output."
             )
 
-        parsed_dict = _parse_srcinfo_content(srcinfo_content, pkgbuild_file_path)
-        
-        # .SRCINFO might not have all fields if PKGBUILD is minimal/broken
-        # Default to empty strings or lists where appropriate in PKGBUILDData
-        
-        # pkgname in .SRCINFO is always a list, even for single packages
-        pkgname_list = parsed_dict.get("pkgname", [])
-        if not pkgname_list:
-             raise PKGBUILDParseError(
-                pkgbuild_path=str(pkgbuild_file_path),
-                message="Mandatory 'pkgname' not found in .SRCINFO."
-            )
-
-        data = PKGBUILDData(
-            pkgbuild_path=pkgbuild_file_path.resolve(),
-            pkgbase=parsed_dict.get("pkgbase", pkgname_list[0]), # Fallback pkgbase to first pkgname
-            pkgname=pkgname_list,
-            pkgver=parsed_dict.get("pkgver", ""),
-            pkgrel=parsed_dict.get("pkgrel", ""),
-            epoch=parsed_dict.get("epoch"), # Optional
-            pkgdesc=parsed_dict.get("pkgdesc", ""),
-            url=parsed_dict.get("url", ""),
-            arch=parsed_dict.get("arch", []),
-            license=parsed_dict.get("license", []),
-            depends=parsed_dict.get("depends", []),
-            makedepends=parsed_dict.get("makedepends", []),
-            checkdepends=parsed_dict.get("checkdepends", []),
-            optdepends=parsed_dict.get("optdepends", []),
-            provides=parsed_dict.get("provides", []),
-            conflicts=parsed_dict.get("conflicts", []),
-            replaces=parsed_dict.get("replaces", []),
-            source=parsed_dict.get("source", []),
-            sha256sums=parsed_dict.get("sha256sums", [])
-            # Add other checksums and fields as needed
-        )
-        
-        # Basic validation: pkgver and pkgrel should exist if pkgname does
-        if not data.pkgver or not data.pkgrel:
-            logger.warning(f"Potentially incomplete .SRCINFO for {data.display_name}: pkgver or pkgrel missing.")
-            # Depending on strictness, could raise PKGBUILDParseError here too.
-
-        logger.info(f"Successfully parsed .SRCINFO for {data.display_name} (v{data.current_version_obj})")
-        return data
+        _srcinfo_cache.put(pkgbuild_file_path, "".join(raw_lines))
+        return _data_from_parsed_dict(parsed_dict, pkgbuild_file_path)
 
     except PKGBUILDParseError as e: # Catch our own specific error
         logger.error(str(e))
@@ -171,3 +314,111 @@ def parse_pkgbuild_srcinfo(
     except Exception as e: # Catch any other unexpected errors
         logger.error(f"An unexpected error occurred parsing {pkgbuild_file_path}: {e}", exc_info=True)
         return None
+
+
+# Sentinels delimiting each package's srcinfo block in batched output.
+_SRCINFO_START = "===SRCINFO_START==="
+_SRCINFO_END_PREFIX = "===SRCINFO_END:"
+
+# One bash invocation prints every directory's srcinfo, separated by
+# sentinels carrying the per-directory makepkg exit code. 2N fork/exec
+# pairs (bash + makepkg per package) collapse into a single pipeline.
+_BATCH_SRCINFO_SCRIPT = (
+    'for d in "$@"; do '
+    f'echo "{_SRCINFO_START}"; '
+    '(cd "$d" && makepkg --printsrcinfo --nocolor); '
+    f'echo "{_SRCINFO_END_PREFIX}$?==="; '
+    'done'
+)
+
+
+def parse_pkgbuild_srcinfos_batch(
+    pkgbuild_file_paths: List[Path],
+    builder_home_dir: Optional[Path] = None
+) -> Dict[Path, PKGBUILDData]:
+    """
+    Generates and parses .SRCINFO for several PKGBUILDs in one subprocess.
+
+    Directories are fed as arguments to a single shell loop whose output is
+    split on sentinel lines, so N packages cost one fork/exec instead of N.
+    Packages that fail to generate or parse are logged and omitted from the
+    returned mapping.
+    """
+    results: Dict[Path, PKGBUILDData] = {}
+    ordered_paths: List[Path] = []
+    for pkgbuild_file_path in pkgbuild_file_paths:
+        if not pkgbuild_file_path.is_file():
+            logger.error(f"PKGBUILD file not found at: {pkgbuild_file_path}")
+            continue
+        # Cache hits are parsed straight away and stay out of the batch run.
+        cached_srcinfo = _srcinfo_cache.get(pkgbuild_file_path)
+        if cached_srcinfo:
+            logger.debug(f"Using cached .SRCINFO for: {pkgbuild_file_path}")
+            try:
+                results[pkgbuild_file_path] = _data_from_srcinfo(cached_srcinfo, pkgbuild_file_path)
+            except PKGBUILDParseError as e:
+                logger.error(str(e))
+            continue
+        ordered_paths.append(pkgbuild_file_path)
+    if not ordered_paths:
+        return results
+
+    env_vars = None
+    if builder_home_dir:
+        env_vars = os.environ.copy()
+        env_vars["HOME"] = str(builder_home_dir)
+
+    command = _as_nobody(["bash", "-c", _BATCH_SRCINFO_SCRIPT,
+                          "srcinfo-batch", *(str(p.parent) for p in ordered_paths)])
+    try:
+        process = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            check=False, # Per-package failures are reported via the sentinels
+            env=env_vars,
+            **_MAKEPKG_USER_KWARGS
+        )
+    except FileNotFoundError:
+        logger.critical("The 'makepkg' command (or bash/sudo) was not found. It is required to parse PKGBUILDs.")
+        return results
+
+    # Blocks arrive in argument order; pair them back up with their paths.
+    block_index = 0
+    current_lines: Optional[List[str]] = None
+    for line in process.stdout.splitlines():
+        if line == _SRCINFO_START:
+            current_lines = []
+            continue
+        if line.startswith(_SRCINFO_END_PREFIX):
+            if block_index >= len(ordered_paths):
+                break # More sentinels than inputs; malformed output
+            pkgbuild_file_path = ordered_paths[block_index]
+            block_index += 1
+            try:
+                makepkg_rc = int(line[len(_SRCINFO_END_PREFIX):-3])
+            except ValueError:
+                makepkg_rc = -1
+            if makepkg_rc != 0:
+                logger.error(f"makepkg --printsrcinfo failed with exit code {makepkg_rc} "
+                             f"for {pkgbuild_file_path} (batched run).")
+            elif not current_lines:
+                logger.error(f"makepkg --printsrcinfo produced no output for {pkgbuild_file_path}.")
+            else:
+                srcinfo_content = "\n".join(current_lines)
+                try:
+                    results[pkgbuild_file_path] = _data_from_srcinfo(
+                        srcinfo_content, pkgbuild_file_path)
+                    _srcinfo_cache.put(pkgbuild_file_path, srcinfo_content)
+                except PKGBUILDParseError as e:
+                    logger.error(str(e))
+            current_lines = None
+            continue
+        if current_lines is not None:
+            current_lines.append(line)
+
+    if block_index != len(ordered_paths):
+        logger.error(f"Batched srcinfo run returned {block_index} block(s) for "
+                     f"{len(ordered_paths)} package(s); missing packages were skipped. "
+                     f"Stderr: {process.stderr.strip()[:500]}")
+    return results
@@ -3,14 +3,29 @@ utils.py - Common utility functions and classes.
 """
 import subprocess
 import shlex
+import shutil
 import logging
+import tempfile
+import threading
 from pathlib import Path # <<< ADD THIS IMPORT
-from typing import Optional, Dict, List # Keep existing typing imports
+from typing import IO, Optional, Dict, List # Keep existing typing imports
 
 from .models import SubprocessResult
 
 logger = logging.getLogger(__name__)
 
+# Outputs up to this size stay in memory; larger ones (makepkg build logs,
+# gh release output) spill to disk so peak RSS stays bounded.
+_SPOOL_MAX_SIZE = 64 * 1024
+
+
+def _drain_to_spool(stream: IO[str], spool: IO[str]) -> None:
+    """Copies a child process pipe into a spooled temp file, then closes the pipe."""
+    try:
+        shutil.copyfileobj(stream, spool, _SPOOL_MAX_SIZE)
+    finally:
+        stream.close()
+
 def run_subprocess(
     command: List[str],
     cwd: Optional[str | Path] = None, # Now Path is defined
@@ -22,36 +37,79 @@ def run_subprocess(
     """
     Runs a subprocess command with consistent logging and error handling.
     """
-    command_str = shlex.join(command)
+    # shlex.join is an O(n) escaping pass per call; defer it until something
+    # (debug logging, an error path, or the result) actually needs the string.
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    command_str: Optional[str] = None
     # Ensure cwd is converted to string for subprocess.run if it's a Path object
     cwd_str = str(cwd) if isinstance(cwd, Path) else cwd
-    logger.debug(f"Running command: {command_str}" + (f" in {cwd_str}" if cwd_str else ""))
+    if debug_enabled:
+        command_str = shlex.join(command)
+        logger.debug("Running command: %s%s", command_str, f" in {cwd_str}" if cwd_str else "")
 
     try:
-        process = subprocess.run(
+        # Popen + spooled temp files instead of subprocess.run(capture_output=True):
+        # small outputs stay in RAM, multi-MB makepkg logs spill to disk instead
+        # of being materialized as one giant string buffer.
+        process = subprocess.Popen(
             command,
             cwd=cwd_str, # Use the string version of cwd
             env=env,
             text=True,
-            capture_output=capture_output,
-            input=input_str,
-            check=check
+            stdout=subprocess.PIPE if capture_output else None,
+            stderr=subprocess.PIPE if capture_output else None,
+            stdin=subprocess.PIPE if input_str is not None else None
         )
-        stdout = process.stdout.strip() if process.stdout else ""
-        stderr = process.stderr.strip() if process.stderr else ""
-        
-        if stdout:
-            logger.debug(f"Command stdout: {stdout}")
-        if stderr:
-            logger.debug(f"Command stderr: {stderr}")
+
+        drain_threads: List[threading.Thread] = []
+        stdout_spool: Optional[IO[str]] = None
+        stderr_spool: Optional[IO[str]] = None
+        if capture_output:
+            stdout_spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE, mode='w+')
+            stderr_spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE, mode='w+')
+            for pipe, spool in ((process.stdout, stdout_spool), (process.stderr, stderr_spool)):
+                thread = threading.Thread(target=_drain_to_spool, args=(pipe, spool), daemon=True)
+                thread.start()
+                drain_threads.append(thread)
+
+        if input_str is not None and process.stdin is not None:
+            try:
+                process.stdin.write(input_str)
+            finally:
+                process.stdin.close()
+
+        returncode = process.wait()
+        for thread in drain_threads:
+            thread.join()
+
+        stdout = ""
+        stderr = ""
+        if capture_output:
+            stdout_spool.seek(0)
+            stdout = stdout_spool.read().strip()
+            stdout_spool.close()
+            stderr_spool.seek(0)
+            stderr = stderr_spool.read().strip()
+            stderr_spool.close()
+
+        if check and returncode != 0:
+            raise subprocess.CalledProcessError(returncode, command, output=stdout, stderr=stderr)
+
+        if debug_enabled:
+            if stdout:
+                logger.debug("Command stdout: %s", stdout)
+            if stderr:
+                logger.debug("Command stderr: %s", stderr)
 
         return SubprocessResult(
-            returncode=process.returncode,
+            returncode=returncode,
             stdout=stdout,
             stderr=stderr,
-            command_str=command_str
+            command_str=command_str if command_str is not None else shlex.join(command)
         )
     except subprocess.CalledProcessError as e:
+        if command_str is None:
+            command_str = shlex.join(command)
         stdout = e.stdout.strip() if hasattr(e, 'stdout') and e.stdout else ""
         stderr = e.stderr.strip() if hasattr(e, 'stderr') and e.stderr else ""
         logger.error(f"Command failed with exit code {e.returncode}: {command_str}")
@@ -59,10 +117,14 @@ def run_subprocess(
             logger.error(f"Failed command stdout: {stdout}")
         if stderr:
             logger.error(f"Failed command stderr: {stderr}")
-        raise 
+        raise
     except FileNotFoundError:
+        if command_str is None:
+            command_str = shlex.join(command)
         logger.error(f"Command not found: {command[0]} from command: {command_str}")
         raise
     except Exception as e:
+        if command_str is None:
+            command_str = shlex.join(command)
         logger.error(f"An unexpected error occurred while running command {command_str}: {e}", exc_info=True)
         raise
\ No newline at end of file
@@ -1,64 +1,239 @@
 # arch_package_updater/workspace_scanner.py
+import concurrent.futures
+import fnmatch
+import functools
 import logging
+import os
+import re
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass, field
+from typing import List, Tuple, Optional
+from dataclasses import dataclass
 
 
 from .models import BuildConfiguration # Only need BuildConfiguration here
 
 logger = logging.getLogger(__name__)
 
-@dataclass # Simple dataclass for this stage
+# First 'pkgbase=' (preferred) or 'pkgname=' assignment in a PKGBUILD.
+_PKGBASE_RE = re.compile(r'^(pkgbase|pkgname)\s*=\s*([^\s#]+)', re.M)
+
+# Directory names never descended into while scanning for PKGBUILDs: VCS
+# metadata, virtualenvs, and tool caches can hold tens of thousands of
+# entries and cannot contain packages.
+_PRUNED_DIR_NAMES = frozenset({
+    ".git", ".github", "node_modules", ".venv", "venv",
+    "__pycache__", ".mypy_cache", ".ruff_cache", ".tox",
+})
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_search_patterns(patterns: Tuple[str, ...]) -> re.Pattern:
+    """Folds all search patterns into one alternation regex over relative paths.
+
+    One match call per candidate replaces a glob expansion per pattern.
+    fnmatch's '*' already crosses '/', so '**/PKGBUILD' covers any depth; a
+    bare variant is added for such patterns so root-level files match too
+    (Path.glob treated '**' as zero-or-more directories).
+    """
+    parts = []
+    for pattern in patterns:
+        parts.append(fnmatch.translate(pattern))
+        if pattern.startswith("**/"):
+            parts.append(fnmatch.translate(pattern[3:]))
+    return re.compile("|".join(parts))
+
+
+def _walk_for_pkgbuilds(root: str) -> List[Tuple[str, bool]]:
+    """Collects (PKGBUILD path, has .nvchecker.toml sibling) pairs under root.
+
+    One readdir per directory: DirEntry carries the d_type needed for the
+    is_dir/is_file checks, so no extra stat calls, no intermediate Path
+    objects, and no per-segment pattern matching like Path.glob does. The
+    sibling .nvchecker.toml is spotted in the same listing, so no per-package
+    existence stat is needed later. Unreadable directories are logged and
+    skipped.
+    """
+    results: List[Tuple[str, bool]] = []
+    pending = deque([root])
+    # Bound-method hoists: these run once per directory entry in the walk's
+    # innermost loop, so skip the repeated attribute lookups.
+    popleft = pending.popleft
+    push_dir = pending.append
+    emit = results.append
+    while pending:
+        current = popleft()
+        pkgbuild_path: Optional[str] = None
+        has_nv_toml = False
+        try:
+            with os.scandir(current) as dir_it:
+                for entry in dir_it:
+                    name = entry.name
+                    if name == "PKGBUILD":
+                        if entry.is_file(follow_symlinks=False):
+                            pkgbuild_path = entry.path
+                    elif name == ".nvchecker.toml":
+                        has_nv_toml = entry.is_file(follow_symlinks=False)
+                    elif name not in _PRUNED_DIR_NAMES and entry.is_dir(follow_symlinks=False):
+                        push_dir(entry.path)
+        except OSError as e:
+            logger.warning(f"Could not scan directory '{current}': {e}")
+        if pkgbuild_path is not None:
+            emit((pkgbuild_path, has_nv_toml))
+    return results
+
+
+def _walk_for_pkgbuilds_parallel(root: str) -> List[Tuple[str, bool]]:
+    """Fans the PKGBUILD walk out over top-level subdirectories.
+
+    The scan is syscall-latency-bound, not CPU-bound — scandir releases the
+    GIL around getdents — so overlapping per-subtree walks in a small thread
+    pool hides cold-cache directory I/O. Falls back to the serial walker for
+    flat layouts.
+    """
+    results: List[Tuple[str, bool]] = []
+    subdirs: List[str] = []
+    root_pkgbuild: Optional[str] = None
+    root_has_nv_toml = False
+    try:
+        with os.scandir(root) as dir_it:
+            for entry in dir_it:
+                if entry.name == "PKGBUILD":
+                    if entry.is_file(follow_symlinks=False):
+                        root_pkgbuild = entry.path
+                elif entry.name == ".nvchecker.toml":
+                    root_has_nv_toml = entry.is_file(follow_symlinks=False)
+                elif entry.name not in _PRUNED_DIR_NAMES and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+    except OSError as e:
+        logger.warning(f"Could not scan directory '{root}': {e}")
+        return results
+    if root_pkgbuild is not None:
+        results.append((root_pkgbuild, root_has_nv_toml))
+
+    if len(subdirs) <= 1:
+        for subdir in subdirs:
+            results.extend(_walk_for_pkgbuilds(subdir))
+        return results
+
+    max_workers = min(32, len(subdirs), (os.cpu_count() or 2) * 4)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for sub_results in pool.map(_walk_for_pkgbuilds, subdirs):
+            results.extend(sub_results)
+    return results
+
+@dataclass(slots=True) # Simple dataclass for this stage; no __dict__ per instance
 class PotentialPackage:
     pkgbuild_path: Path
     nvchecker_config_path_relative: Optional[str] = None
-    # We might need pkgbase here if .nvchecker.toml doesn't name the package explicitly.
-    # For now, assume nvchecker files are named or sectioned by pkgbase.
-    # Alternatively, a quick grep for pkgbase in PKGBUILD could be done here.
-    # For simplicity, let's assume nvchecker_client can later map nvchecker output names to pkgbuild_paths.
+    # True pkgbase read from the PKGBUILD text (one regex pass, no makepkg),
+    # so later stages can key by it instead of guessing from the dir name.
+    # Always set: falls back to the containing directory's name, computed
+    # once at scan time with string ops instead of Path.parent.name per use.
+    pkgbase: str = ""
+
+
+def _extract_pkgbase(pkgbuild_path: Path) -> Optional[str]:
+    """Pulls pkgbase (or the first pkgname) from a PKGBUILD in one regex pass."""
+    try:
+        content = pkgbuild_path.read_text(encoding='utf-8', errors='replace')
+    except OSError as e:
+        logger.warning(f"Could not read '{pkgbuild_path}' to extract pkgbase: {e}")
+        return None
+
+    first_pkgname: Optional[str] = None
+    for match in _PKGBASE_RE.finditer(content):
+        value = match.group(2).strip('\'"()')
+        if not value:
+            continue
+        if match.group(1) == 'pkgbase':
+            return value
+        if first_pkgname is None:
+            first_pkgname = value
+    return first_pkgname
 
 def find_potential_packages(config: BuildConfiguration) -> List[PotentialPackage]:
     """
     Scans the workspace to find PKGBUILD files and their associated .nvchecker.toml files.
     Does not perform a full PKGBUILD parse at this stage.
+
+    Repeat calls within a run (e.g. a dry-run preview followed by the real
+    pass) collapse to a cache lookup keyed on the search root's mtime.
     """
-    search_root = config.pkgbuild_search_root
-    patterns = config.pkgbuild_search_patterns
-    logger.info(f"Scanning for PKGBUILDs in '{search_root}' using patterns: {patterns}")
-    
-    found_pkgbuild_files: List[Path] = []
-    for pattern in patterns:
-        try:
-            # Glob relative to the specified search_root
-            found_pkgbuild_files.extend(list(search_root.glob(pattern)))
-        except Exception as e:
-            logger.error(f"Error during glob pattern '{pattern}' in '{search_root}': {e}")
-            
-    # Filter out duplicates and ensure they are files
-    unique_pkgbuild_paths = sorted(list(set(f for f in found_pkgbuild_files if f.is_file())))
-    
-    if not unique_pkgbuild_paths:
-        logger.warning(f"No PKGBUILD files found in '{search_root}' with patterns: {patterns}")
+    root_str = os.path.realpath(os.fspath(config.pkgbuild_search_root))
+    patterns = tuple(config.pkgbuild_search_patterns)
+    ws_root = os.path.realpath(os.fspath(config.github_workspace))
+    try:
+        # Coarse invalidation: the root's mtime changes when its direct
+        # children do, which covers the package-dir-added/removed case;
+        # within one CI run the tree is static anyway.
+        root_mtime_ns = os.stat(root_str).st_mtime_ns
+    except OSError:
+        return list(_scan_for_potential_packages(root_str, patterns, ws_root))
+    return list(_find_potential_packages_cached(root_str, patterns, ws_root, root_mtime_ns))
+
+
+@functools.lru_cache(maxsize=4)
+def _find_potential_packages_cached(
+    root_str: str, patterns: Tuple[str, ...], ws_root: str, root_mtime_ns: int
+) -> Tuple[PotentialPackage, ...]:
+    return tuple(_scan_for_potential_packages(root_str, patterns, ws_root))
+
+
+def _scan_for_potential_packages(
+    root_str: str, patterns: Tuple[str, ...], ws_root: str
+) -> List[PotentialPackage]:
+    logger.info(f"Scanning for PKGBUILDs in '{root_str}' using patterns: {list(patterns)}")
+
+    # The walker only emits regular files named PKGBUILD and visits each
+    # directory once, so the paths are unique; sort for a stable order and
+    # convert to Path only for the matches. The configured patterns filter
+    # that single stream via one combined regex instead of one subtree glob
+    # per pattern.
+    # The root is already canonical, so every emitted path is resolved —
+    # the walker never follows symlinked dirs — and no per-match
+    # realpath/prefix fixups are needed.
+    pattern_re = _compile_search_patterns(patterns)
+    rel_start = len(root_str) + 1 # entry paths are root_str + os.sep + rel
+    scan_pairs = sorted(
+        pair for pair in _walk_for_pkgbuilds_parallel(root_str)
+        if pattern_re.match(pair[0][rel_start:])
+    )
+
+    if not scan_pairs:
+        logger.warning(f"No PKGBUILD files found in '{root_str}'.")
         return []
 
+    # Overlap the per-PKGBUILD pkgbase reads: each one is an open+read whose
+    # latency dominates on cold caches, so fan them out over threads instead
+    # of paying the round trips serially.
+    match_paths = [Path(pair[0]) for pair in scan_pairs]
+    if len(match_paths) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, len(match_paths))) as pool:
+            extracted_pkgbases = list(pool.map(_extract_pkgbase, match_paths))
+    else:
+        extracted_pkgbases = [_extract_pkgbase(match_paths[0])]
+
     potential_pkgs: List[PotentialPackage] = []
-    for pkgbuild_path_abs in unique_pkgbuild_paths:
-        nvchecker_toml_abs_path: Optional[Path] = None
-        # .nvchecker.toml is usually in the same directory as PKGBUILD
-        potential_nv_toml = pkgbuild_path_abs.parent / ".nvchecker.toml"
-        if potential_nv_toml.is_file():
-            nvchecker_toml_abs_path = potential_nv_toml.resolve()
-        
+    for (pkgbuild_path_str, has_nv_toml), resolved_pkgbuild_path, extracted_pkgbase in zip(
+            scan_pairs, match_paths, extracted_pkgbases):
+
+        nvchecker_toml_rel_path: Optional[str] = None
+        if has_nv_toml:
+            nvchecker_toml_rel_path = os.path.relpath(
+                os.path.join(os.path.dirname(pkgbuild_path_str), ".nvchecker.toml"), ws_root)
         potential_pkgs.append(
             PotentialPackage(
-                pkgbuild_path=pkgbuild_path_abs.resolve(),
-                nvchecker_config_path_absolute=nvchecker_toml_abs_path
+                pkgbuild_path=resolved_pkgbuild_path,
+                nvchecker_config_path_relative=nvchecker_toml_rel_path,
+                pkgbase=extracted_pkgbase
+                        or os.path.basename(os.path.dirname(pkgbuild_path_str))
             )
         )
-        logger.debug(f"Found potential package: PKGBUILD at '{pkgbuild_path_abs}', "
-                     f"nvchecker: '{nvchecker_toml_abs_path if nvchecker_toml_abs_path else 'None'}'")
+        # %-style so the interpolation only happens when DEBUG is emitted.
+        logger.debug("Found potential package: PKGBUILD at '%s', nvchecker: '%s'",
+                     pkgbuild_path_str, nvchecker_toml_rel_path)
             
-    logger.info(f"Identified {len(potential_pkgs)} potential packages with PKGBUILDs from '{search_root}'.")
+    logger.info(f"Identified {len(potential_pkgs)} potential packages with PKGBUILDs from '{root_str}'.")
     return potential_pkgs
 
@@ -1,9 +1,19 @@
 """
 conftest.py - Shared fixtures for pytest.
 """
+import os
+import tempfile
+
 import pytest
 from pathlib import Path
 
+# Redirect the persistent srcinfo cache before gh_aur_updater modules are
+# imported, so test runs never read or write the real user cache dir.
+os.environ.setdefault(
+    "GH_AUR_UPDATER_CACHE_DIR",
+    tempfile.mkdtemp(prefix="gh-aur-updater-test-cache-"),
+)
+
 # Example fixture if needed later
 @pytest.fixture
 def tmp_workspace(tmp_path: Path) -> Path:
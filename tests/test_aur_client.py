@@ -4,9 +4,9 @@ tests/test_aur_client.py - Tests for AUR client.
 import pytest
 import requests
 import responses # from responses library
-from gh-aur-updater.aur_client import fetch_maintained_packages, AUR_RPC_BASE_URL
-from gh-aur-updater.models import AURPackageInfo
-from gh-aur-updater.exceptions import ArchPackageUpdaterError
+from gh_aur_updater.aur_client import fetch_maintained_packages, AUR_RPC_BASE_URL
+from gh_aur_updater.models import AURPackageInfo
+from gh_aur_updater.exceptions import ArchPackageUpdaterError
 
 @responses.activate # This decorator handles mocking for requests library
 def test_fetch_maintained_packages_success():
@@ -4,7 +4,7 @@ tests/test_config.py - Unit tests for configuration loading.
 import os
 import pytest
 from pathlib import Path
-from gh-aur-updater.config import load_configuration, BuildConfiguration
+from gh_aur_updater.config import load_configuration, BuildConfiguration
 
 @pytest.fixture
 def mock_env_vars(monkeypatch):
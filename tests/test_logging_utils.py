@@ -5,7 +5,7 @@ import logging
 import pytest
 import sys
 import os
-from gh-aur-updater.logging_utils import GitHubActionsFormatter, setup_logging, IS_GHA
+from gh_aur_updater.logging_utils import GitHubActionsFormatter, setup_logging, IS_GHA
 
 # To capture log output
 from io import StringIO
@@ -59,7 +59,7 @@ def test_gha_formatter_error(gha_formatter):
 
 # In tests/test_logging_utils.py
 def test_setup_logging_gha_mode_info(monkeypatch): # Renamed to reflect it tests INFO level
-    monkeypatch.setattr("gh-aur-updater.logging_utils.IS_GHA", True)
+    monkeypatch.setattr("gh_aur_updater.logging_utils.IS_GHA", True)
     log_capture_string = StringIO()
     root_logger = logging.getLogger()
     for handler in root_logger.handlers[:]: root_logger.removeHandler(handler)
@@ -111,7 +111,7 @@ def test_setup_logging_debug_mode(monkeypatch):
 # In tests/test_logging_utils.py
 
 def test_setup_logging_gha_mode_info_as_notice(monkeypatch): # Test INFO logs become ::notice
-    monkeypatch.setattr("gh-aur-updater.logging_utils.IS_GHA", True)
+    monkeypatch.setattr("gh_aur_updater.logging_utils.IS_GHA", True)
     log_capture_string = StringIO()
     root_logger = logging.getLogger()
     for handler in root_logger.handlers[:]: root_logger.removeHandler(handler)
@@ -136,7 +136,7 @@ def test_setup_logging_gha_mode_info_as_notice(monkeypatch): # Test INFO logs be
     assert root_logger.level == logging.INFO
 
 def test_setup_logging_gha_mode_debug(monkeypatch): # Test DEBUG logs become ::debug
-    monkeypatch.setattr("gh-aur-updater.logging_utils.IS_GHA", True)
+    monkeypatch.setattr("gh_aur_updater.logging_utils.IS_GHA", True)
     log_capture_string = StringIO()
     root_logger = logging.getLogger()
     for handler in root_logger.handlers[:]: root_logger.removeHandler(handler)
@@ -2,7 +2,7 @@
 tests/test_models.py - Unit tests for data models.
 """
 import pytest
-from gh-aur-updater.models import PkgVersion, PKGBUILDData # Add other models as needed
+from gh_aur_updater.models import PkgVersion, PKGBUILDData # Add other models as needed
 from pathlib import Path
 
 class TestPkgVersion:
@@ -1,14 +1,15 @@
 """
 tests/test_pkgbuild_parser.py - Tests for PKGBUILD parsing via .SRCINFO.
 """
+import io
 import pytest
 import os
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from gh-aur-updater.pkgbuild_parser import parse_pkgbuild_srcinfo, _parse_srcinfo_content
-from gh-aur-updater.models import PKGBUILDData
-from gh-aur-updater.exceptions import PKGBUILDParseError
+from gh_aur_updater.pkgbuild_parser import parse_pkgbuild_srcinfo, _parse_srcinfo_content
+from gh_aur_updater.models import PKGBUILDData
+from gh_aur_updater.exceptions import PKGBUILDParseError
 import subprocess # For CalledProcessError
 
 # Sample .SRCINFO content
@@ -60,6 +61,15 @@ EMPTY_SRCINFO = ""
 MALFORMED_SRCINFO = "pkgver\npkgrel=1"
 
 
+def _mock_popen_process(stdout: str, stderr: str, returncode: int) -> MagicMock:
+    """Builds a Popen mock whose pipes stream like the real text-mode ones."""
+    mock_process = MagicMock()
+    mock_process.stdout = io.StringIO(stdout)
+    mock_process.stderr = io.StringIO(stderr)
+    mock_process.wait.return_value = returncode
+    return mock_process
+
+
 def test_parse_srcinfo_content_single_package():
     data = _parse_srcinfo_content(SAMPLE_SRCINFO_SINGLE, Path("PKGBUILD.sample"))
     assert data['pkgbase'] == 'mypackage'
@@ -91,16 +101,15 @@ def test_parse_srcinfo_content_split_package():
     # might create nested structures for split packages if that level of detail is needed.
     # For now, it correctly aggregates all 'depends' lines found.
 
-@patch('subprocess.run')
-def test_parse_pkgbuild_srcinfo_success(mock_subprocess_run, tmp_path):
+# Pin the sudo fallback path so the asserted argv doesn't depend on
+# whether the test process happens to run as root.
+@patch('gh_aur_updater.pkgbuild_parser._MAKEPKG_USER_KWARGS', {})
+@patch('subprocess.Popen')
+def test_parse_pkgbuild_srcinfo_success(mock_popen, tmp_path):
     pkgbuild_file = tmp_path / "PKGBUILD"
     pkgbuild_file.touch()
 
-    mock_process = MagicMock()
-    mock_process.returncode = 0
-    mock_process.stdout = SAMPLE_SRCINFO_SINGLE
-    mock_process.stderr = ""
-    mock_subprocess_run.return_value = mock_process
+    mock_popen.return_value = _mock_popen_process(SAMPLE_SRCINFO_SINGLE, "", 0)
 
     result = parse_pkgbuild_srcinfo(pkgbuild_file)
 
@@ -108,37 +117,31 @@ def test_parse_pkgbuild_srcinfo_success(mock_subprocess_run, tmp_path):
     assert result.pkgbase == "mypackage"
     assert result.pkgver == "1.2.3"
     assert str(result.current_version_obj) == "1:1.2.3-2"
-    mock_subprocess_run.assert_called_once_with(
-        ["makepkg", "--printsrcinfo", "--nocolor"],
-        cwd=str(tmp_path), capture_output=True, text=True, check=False, env=pytest.approx(os.environ.copy())
-    )
+    mock_popen.assert_called_once()
+    called_args, called_kwargs = mock_popen.call_args
+    assert called_args[0] == [
+        "sudo", "-u", "nobody", "makepkg", "--printsrcinfo", "--nocolor"
+    ]
+    assert called_kwargs["cwd"] == str(tmp_path)
 
-@patch('subprocess.run')
-def test_parse_pkgbuild_srcinfo_makepkg_failure(mock_subprocess_run, tmp_path):
+@patch('subprocess.Popen')
+def test_parse_pkgbuild_srcinfo_makepkg_failure(mock_popen, tmp_path):
     pkgbuild_file = tmp_path / "PKGBUILD"
     pkgbuild_file.touch()
 
-    mock_process = MagicMock()
-    mock_process.returncode = 1
-    mock_process.stdout = ""
-    mock_process.stderr = "makepkg error details"
-    mock_subprocess_run.return_value = mock_process
-    
+    mock_popen.return_value = _mock_popen_process("", "makepkg error details", 1)
+
     # parse_pkgbuild_srcinfo now catches PKGBUILDParseError itself and returns None
     result = parse_pkgbuild_srcinfo(pkgbuild_file)
     assert result is None
     # To check log: caplog.records would contain the error
 
-@patch('subprocess.run')
-def test_parse_pkgbuild_srcinfo_no_output(mock_subprocess_run, tmp_path):
+@patch('subprocess.Popen')
+def test_parse_pkgbuild_srcinfo_no_output(mock_popen, tmp_path):
     pkgbuild_file = tmp_path / "PKGBUILD"
     pkgbuild_file.touch()
 
-    mock_process = MagicMock()
-    mock_process.returncode = 0
-    mock_process.stdout = "" # No output
-    mock_process.stderr = ""
-    mock_subprocess_run.return_value = mock_process
+    mock_popen.return_value = _mock_popen_process("", "", 0) # No output
 
     result = parse_pkgbuild_srcinfo(pkgbuild_file)
     assert result is None
@@ -147,17 +150,50 @@ def test_parse_pkgbuild_file_not_found():
     result = parse_pkgbuild_srcinfo(Path("/non/existent/PKGBUILD"))
     assert result is None
 
-@patch('subprocess.run')
-def test_parse_pkgbuild_srcinfo_no_pkgname(mock_subprocess_run, tmp_path):
+@patch('subprocess.Popen')
+def test_parse_pkgbuild_srcinfo_no_pkgname(mock_popen, tmp_path):
     pkgbuild_file = tmp_path / "PKGBUILD"
     pkgbuild_file.touch()
-    
+
     minimal_srcinfo_no_pkgname = "pkgbase = test\npkgver = 1.0" # Missing pkgname
+    mock_popen.return_value = _mock_popen_process(minimal_srcinfo_no_pkgname, "", 0)
+
+    result = parse_pkgbuild_srcinfo(pkgbuild_file)
+    assert result is None # Should fail if pkgname is missing
+
+@patch('subprocess.run')
+def test_parse_pkgbuild_srcinfos_batch(mock_subprocess_run, tmp_path):
+    from gh_aur_updater.pkgbuild_parser import parse_pkgbuild_srcinfos_batch
+
+    dir_a = tmp_path / "mypackage"
+    dir_b = tmp_path / "broken"
+    dir_a.mkdir()
+    dir_b.mkdir()
+    pkgbuild_a = dir_a / "PKGBUILD"
+    pkgbuild_b = dir_b / "PKGBUILD"
+    pkgbuild_a.touch()
+    pkgbuild_b.touch()
+
     mock_process = MagicMock()
     mock_process.returncode = 0
-    mock_process.stdout = minimal_srcinfo_no_pkgname
+    mock_process.stdout = (
+        "===SRCINFO_START===\n"
+        + SAMPLE_SRCINFO_SINGLE.strip() + "\n"
+        "===SRCINFO_END:0===\n"
+        "===SRCINFO_START===\n"
+        "===SRCINFO_END:12===\n"  # second package's makepkg failed
+    )
     mock_process.stderr = ""
     mock_subprocess_run.return_value = mock_process
 
-    result = parse_pkgbuild_srcinfo(pkgbuild_file)
-    assert result is None # Should fail if pkgname is missing
+    results = parse_pkgbuild_srcinfos_batch([pkgbuild_a, pkgbuild_b])
+
+    # One subprocess for both packages
+    mock_subprocess_run.assert_called_once()
+    called_args, _ = mock_subprocess_run.call_args
+    assert str(dir_a) in called_args[0]
+    assert str(dir_b) in called_args[0]
+
+    assert set(results) == {pkgbuild_a}
+    assert results[pkgbuild_a].pkgbase == "mypackage"
+    assert results[pkgbuild_a].pkgver == "1.2.3"
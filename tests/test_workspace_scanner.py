@@ -0,0 +1,66 @@
+"""
+tests/test_workspace_scanner.py - Tests for the workspace PKGBUILD scanner.
+"""
+from pathlib import Path
+
+from gh_aur_updater.models import BuildConfiguration
+from gh_aur_updater.workspace_scanner import PotentialPackage, find_potential_packages
+
+
+def _make_config(workspace: Path) -> BuildConfiguration:
+    return BuildConfiguration(
+        github_repository="owner/repo",
+        github_token="token",
+        github_workspace=workspace,
+        github_run_id="1",
+        github_actor="actor",
+        aur_maintainer_name="maintainer",
+        aur_git_user_name="aur_user",
+        aur_git_user_email="aur_user@example.com",
+        source_repo_git_user_name="source_user",
+        source_repo_git_user_email="source_user@example.com",
+        base_build_dir=workspace / "build",
+        nvchecker_run_dir=workspace / "nvchecker",
+        artifacts_dir_base=workspace / "artifacts",
+        commit_message_prefix="UPD",
+        debug_mode=False,
+        dry_run_mode=True,
+        pkgbuild_search_root=workspace,
+    )
+
+
+def test_potential_package_schema():
+    # Locks the constructor signature the scanner relies on.
+    pp = PotentialPackage(
+        pkgbuild_path=Path("/ws/mypkg/PKGBUILD"),
+        nvchecker_config_path_relative="mypkg/.nvchecker.toml",
+        pkgbase="mypkg",
+    )
+    assert pp.pkgbuild_path == Path("/ws/mypkg/PKGBUILD")
+    assert pp.nvchecker_config_path_relative == "mypkg/.nvchecker.toml"
+    assert pp.pkgbase == "mypkg"
+
+
+def test_find_potential_packages(tmp_workspace):
+    pkg_a = tmp_workspace / "pkg-a"
+    pkg_a.mkdir()
+    (pkg_a / "PKGBUILD").write_text("pkgbase=alpha\npkgver=1.0\n")
+    (pkg_a / ".nvchecker.toml").write_text("[alpha]\n")
+
+    pkg_b = tmp_workspace / "nested" / "pkg-b"
+    pkg_b.mkdir(parents=True)
+    (pkg_b / "PKGBUILD").write_text("pkgname=beta\npkgver=2.0\n")
+
+    # Must be pruned, never reported.
+    git_dir = tmp_workspace / ".git" / "some-clone"
+    git_dir.mkdir(parents=True)
+    (git_dir / "PKGBUILD").write_text("pkgbase=hidden\n")
+
+    found = find_potential_packages(_make_config(tmp_workspace))
+
+    assert sorted(pp.pkgbase for pp in found) == ["alpha", "beta"]
+    by_base = {pp.pkgbase: pp for pp in found}
+    assert by_base["alpha"].nvchecker_config_path_relative == "pkg-a/.nvchecker.toml"
+    assert by_base["beta"].nvchecker_config_path_relative is None
+    assert by_base["beta"].pkgbuild_path.name == "PKGBUILD"
+    assert "hidden" not in by_base